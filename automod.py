@@ -0,0 +1,207 @@
+import hashlib
+import time
+from collections import OrderedDict, deque
+
+
+class AutoModConfig:
+    """Thresholds for the automatic spam and raid detection"""
+
+    # Messages per user within MESSAGE_WINDOW seconds
+    MESSAGE_LIMIT = 8
+    MESSAGE_WINDOW = 5
+    # Identical messages per user within DUPLICATE_WINDOW seconds
+    DUPLICATE_LIMIT = 4
+    DUPLICATE_WINDOW = 30
+    # User/role mentions per user within MENTION_WINDOW seconds
+    MENTION_LIMIT = 10
+    MENTION_WINDOW = 10
+    # Joins per guild within JOIN_WINDOW seconds before raid mode kicks in
+    JOIN_LIMIT = 10
+    JOIN_WINDOW = 10
+    # How long raid mode lasts after the last burst
+    RAID_DURATION = 300
+    # "mute" or "ban" for members joining while raid mode is on
+    RAID_ACTION = "mute"
+    # Mute length for spam and raid mutes
+    MUTE_SECONDS = 600
+
+    # Users tracked at most, and how long an idle user's state is kept
+    MAX_TRACKED_USERS = 50000
+    USER_IDLE_TTL = 120
+
+
+class RateWindow:
+    """Event count over a sliding window, kept in a fixed ring of buckets.
+
+    The window is split into ``buckets`` slots; moving forward in time only
+    clears the slots that fell out of the window, so ``add`` and ``count``
+    are O(1) and the memory used never grows.
+    """
+
+    __slots__ = ("resolution", "counts", "head", "head_slot", "total")
+
+    def __init__(self, window, buckets=10):
+        self.resolution = window / buckets
+        self.counts = [0] * buckets
+        self.head = 0
+        self.head_slot = 0
+        self.total = 0
+
+    def _advance(self, now):
+        slot = int(now / self.resolution)
+        steps = slot - self.head_slot
+        if steps <= 0:
+            return
+        size = len(self.counts)
+        for _ in range(min(steps, size)):
+            self.head = (self.head + 1) % size
+            self.total -= self.counts[self.head]
+            self.counts[self.head] = 0
+        self.head_slot = slot
+
+    def add(self, now, amount=1):
+        self._advance(now)
+        self.counts[self.head] += amount
+        self.total += amount
+        return self.total
+
+    def count(self, now):
+        self._advance(now)
+        return self.total
+
+    def reset(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+
+
+class DuplicateWindow:
+    """Counts how often each content hash was seen within a window.
+
+    Entries are evicted by age and by a hard size cap, both from the left of
+    a deque, with a dict of counts alongside so lookups stay O(1).
+    """
+
+    __slots__ = ("window", "entries", "counts")
+
+    def __init__(self, window, max_entries=20):
+        self.window = window
+        self.entries = deque(maxlen=max_entries)
+        self.counts = {}
+
+    def _evict(self):
+        digest = self.entries.popleft()[1]
+        self.counts[digest] -= 1
+        if not self.counts[digest]:
+            del self.counts[digest]
+
+    def add(self, now, digest):
+        while self.entries and now - self.entries[0][0] > self.window:
+            self._evict()
+        if len(self.entries) == self.entries.maxlen:
+            self._evict()
+        self.entries.append((now, digest))
+        self.counts[digest] = self.counts.get(digest, 0) + 1
+        return self.counts[digest]
+
+    def reset(self):
+        self.entries.clear()
+        self.counts.clear()
+
+
+class UserState:
+    __slots__ = ("messages", "mentions", "duplicates", "last_seen")
+
+    def __init__(self, config):
+        self.messages = RateWindow(config.MESSAGE_WINDOW)
+        self.mentions = RateWindow(config.MENTION_WINDOW)
+        self.duplicates = DuplicateWindow(config.DUPLICATE_WINDOW)
+        self.last_seen = 0.0
+
+    def reset(self):
+        self.messages.reset()
+        self.mentions.reset()
+        self.duplicates.reset()
+
+
+class AutoMod:
+    """Streaming spam and raid detector.
+
+    Every message and join updates a few fixed-size counters and returns a
+    reason string when a threshold trips, or None. Acting on the verdict is
+    up to the caller.
+    """
+
+    def __init__(self, config=AutoModConfig):
+        self.config = config
+        # (guild_id, user_id) -> UserState, least recently active first
+        self.users = OrderedDict()
+        # guild_id -> RateWindow of joins
+        self.joins = {}
+        # guild_id -> monotonic time raid mode ends
+        self.raids = {}
+
+    def _user_state(self, guild_id, user_id, now):
+        key = (guild_id, user_id)
+        state = self.users.get(key)
+        if state is None:
+            state = self.users[key] = UserState(self.config)
+        else:
+            self.users.move_to_end(key)
+        state.last_seen = now
+
+        # Drop idle or surplus users from the cold end
+        while self.users:
+            oldest = next(iter(self.users.values()))
+            if len(self.users) > self.config.MAX_TRACKED_USERS or now - oldest.last_seen > self.config.USER_IDLE_TTL:
+                self.users.popitem(last=False)
+            else:
+                break
+        return state
+
+    @staticmethod
+    def _digest(content):
+        normalized = " ".join(content.lower().split())
+        return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+    def check_message(self, message, now=None):
+        now = time.monotonic() if now is None else now
+        config = self.config
+        state = self._user_state(message.guild.id, message.author.id, now)
+
+        reason = None
+        if state.messages.add(now) > config.MESSAGE_LIMIT:
+            reason = f"Sending messages too fast ({config.MESSAGE_LIMIT}+ in {config.MESSAGE_WINDOW}s)"
+
+        mentions = len(message.raw_mentions) + len(message.raw_role_mentions)
+        if mentions and state.mentions.add(now, mentions) > config.MENTION_LIMIT:
+            reason = f"Mass mentions ({config.MENTION_LIMIT}+ in {config.MENTION_WINDOW}s)"
+
+        content = message.content
+        if message.attachments:
+            content += "".join(attachment.filename for attachment in message.attachments)
+        if content and state.duplicates.add(now, self._digest(content)) >= config.DUPLICATE_LIMIT:
+            reason = f"Repeated messages ({config.DUPLICATE_LIMIT}x in {config.DUPLICATE_WINDOW}s)"
+
+        if reason:
+            # Start over so one burst only triggers one action
+            state.reset()
+        return reason
+
+    def in_raid(self, guild_id, now=None):
+        now = time.monotonic() if now is None else now
+        return self.raids.get(guild_id, 0) > now
+
+    def check_join(self, member, now=None):
+        now = time.monotonic() if now is None else now
+        config = self.config
+        joins = self.joins.get(member.guild.id)
+        if joins is None:
+            joins = self.joins[member.guild.id] = RateWindow(config.JOIN_WINDOW)
+
+        if joins.add(now) > config.JOIN_LIMIT:
+            # Every further join during the burst extends raid mode
+            self.raids[member.guild.id] = now + config.RAID_DURATION
+
+        if self.in_raid(member.guild.id, now):
+            return f"Joined during a raid ({config.JOIN_LIMIT}+ joins in {config.JOIN_WINDOW}s)"
+        return None
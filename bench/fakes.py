@@ -0,0 +1,313 @@
+"""In-process stand-ins for the parts of discord.py the cogs touch.
+
+Only the attributes and coroutines the handlers actually use are modelled.
+Every call that would hit Discord's REST API goes through :class:`FakeHTTP`,
+which adds latency and enforces per-route and global rate limits the way
+discord.py does (by waiting), counting how often a limit was hit.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+import discord
+
+
+class FakeHTTP:
+    """Simulated REST layer with latency and rate-limit buckets"""
+
+    def __init__(self, latency=0.002, jitter=0.001, route_limit=50, route_window=1.0, global_limit=200):
+        self.latency = latency
+        self.jitter = jitter
+        self.route_limit = route_limit
+        self.route_window = route_window
+        self.global_limit = global_limit
+        # route (or "global") -> (window start, requests in window)
+        self._buckets = {}
+        self.requests = 0
+        self.rate_limited = 0
+
+    async def _acquire(self, key, limit, window):
+        limited = False
+        while True:
+            now = time.monotonic()
+            start, used = self._buckets.get(key, (now, 0))
+            if now - start >= window:
+                start, used = now, 0
+            if used < limit:
+                self._buckets[key] = (start, used + 1)
+                return limited
+            limited = True
+            await asyncio.sleep(start + window - now)
+
+    async def request(self, route):
+        limited = await self._acquire(route, self.route_limit, self.route_window)
+        limited = await self._acquire("global", self.global_limit, 1.0) or limited
+        self.rate_limited += limited
+        self.requests += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+
+class FakeUser:
+    bot = False
+
+    def __init__(self, user_id, name=None):
+        self.id = user_id
+        self.name = name or f"user{user_id}"
+        self.display_name = self.name
+        self.avatar = None
+        self.created_at = datetime.now(timezone.utc)
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeRole:
+    def __init__(self, role_id, name, position=1):
+        self.id = role_id
+        self.name = name
+        self.position = position
+
+    @property
+    def mention(self):
+        return f"<@&{self.id}>"
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+    def __ge__(self, other):
+        return self.position >= other.position
+
+
+class FakeMember(FakeUser):
+    # Lets ``isinstance(member, discord.Member)`` checks in the cogs pass
+    __class__ = property(lambda self: discord.Member)
+
+    def __init__(self, user_id, guild, http, name=None):
+        super().__init__(user_id, name)
+        self.guild = guild
+        self.http = http
+        self.roles = [guild.default_role]
+        self.joined_at = datetime.now(timezone.utc)
+        self.status = discord.Status.online
+        self.guild_permissions = discord.Permissions.none()
+
+    @property
+    def top_role(self):
+        return max(self.roles, key=lambda role: role.position)
+
+    async def add_roles(self, *roles, reason=None):
+        for role in roles:
+            await self.http.request(f"PUT /guilds/{self.guild.id}/members/roles")
+            if role not in self.roles:
+                self.roles.append(role)
+
+    async def remove_roles(self, *roles, reason=None):
+        for role in roles:
+            await self.http.request(f"DELETE /guilds/{self.guild.id}/members/roles")
+            if role in self.roles:
+                self.roles.remove(role)
+
+    async def kick(self, reason=None):
+        await self.http.request(f"DELETE /guilds/{self.guild.id}/members")
+        self.guild.remove_member(self)
+
+    async def send(self, *args, **kwargs):
+        await self.http.request("POST /users/@me/channels")
+
+
+class FakeChannel:
+    def __init__(self, channel_id, name, guild, http):
+        self.id = channel_id
+        self.name = name
+        self.guild = guild
+        self.http = http
+        self.sent = 0
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+    async def send(self, content=None, embed=None, embeds=None, **kwargs):
+        await self.http.request(f"POST /channels/{self.id}/messages")
+        self.sent += 1
+
+    async def set_permissions(self, target, reason=None, **permissions):
+        await self.http.request(f"PUT /channels/{self.id}/permissions")
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(message_id, self)
+
+
+class FakePartialMessage:
+    def __init__(self, message_id, channel):
+        self.id = message_id
+        self.channel = channel
+
+    async def edit(self, **fields):
+        await self.channel.http.request(f"PATCH /channels/{self.channel.id}/messages")
+
+
+class FakeGuild:
+    def __init__(self, guild_id, http, name="Bench Guild"):
+        self.id = guild_id
+        self.name = name
+        self.http = http
+        self.owner_id = 0
+        self.default_role = FakeRole(guild_id, "@everyone", position=0)
+        self._roles = {self.default_role.id: self.default_role}
+        self._members = {}
+        self.text_channels = []
+        self.system_channel = None
+        self.bans = 0
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def roles(self):
+        return list(self._roles.values())
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def channels(self):
+        return list(self.text_channels)
+
+    @property
+    def member_count(self):
+        return len(self._members)
+
+    def add_role(self, role):
+        self._roles[role.id] = role
+        return role
+
+    def add_channel(self, channel_id, name):
+        channel = FakeChannel(channel_id, name, self, self.http)
+        self.text_channels.append(channel)
+        return channel
+
+    def add_member(self, user_id):
+        member = self._members[user_id] = FakeMember(user_id, self, self.http)
+        return member
+
+    def remove_member(self, member):
+        self._members.pop(member.id, None)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_member(self, user_id):
+        return self._members.get(user_id)
+
+    def get_channel(self, channel_id):
+        return discord.utils.get(self.text_channels, id=channel_id)
+
+    async def fetch_member(self, user_id):
+        await self.http.request(f"GET /guilds/{self.id}/members")
+        member = self.get_member(user_id)
+        if member is None:
+            raise discord.NotFound(_FakeResponse(404), "Unknown Member")
+        return member
+
+    async def create_role(self, name, **kwargs):
+        await self.http.request(f"POST /guilds/{self.id}/roles")
+        return self.add_role(FakeRole(random.getrandbits(60), name))
+
+    async def ban(self, user, reason=None, **kwargs):
+        await self.http.request(f"PUT /guilds/{self.id}/bans")
+        self.bans += 1
+        member = self.get_member(user.id)
+        if member is not None:
+            self.remove_member(member)
+
+
+class FakeMessage:
+    def __init__(self, message_id, author, channel, content):
+        self.id = message_id
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.content = content
+        self.attachments = []
+        self.raw_mentions = []
+        self.raw_role_mentions = []
+        self.pinned = False
+
+    async def delete(self):
+        await self.channel.http.request(f"DELETE /channels/{self.channel.id}/messages")
+
+
+class FakeReactionPayload:
+    def __init__(self, guild, message_id, emoji, member):
+        self.guild_id = guild.id
+        self.message_id = message_id
+        self.emoji = emoji
+        self.user_id = member.id
+        self.member = member
+
+
+class FakeInteraction:
+    """A button click on ``message_id``"""
+
+    def __init__(self, message_id, custom_id, user):
+        self.type = discord.InteractionType.component
+        self.custom_id = custom_id
+        self.message = FakePartialMessage(message_id, None)
+        self.user = user
+        self.response = self
+        self.responses = 0
+
+    async def send_message(self, content=None, **kwargs):
+        # Interaction callbacks don't count against the bot's rate limits
+        self.responses += 1
+
+
+class FakeBot:
+    """Just enough of commands.Bot for the cogs' own code paths"""
+
+    def __init__(self, http):
+        self.http = http
+        self.user = FakeUser(1, "BenchBot")
+        self.loop = asyncio.get_running_loop()
+        self.guilds = []
+        self._cogs = {}
+
+    def add_guild(self, guild):
+        self.guilds.append(guild)
+        return guild
+
+    def get_guild(self, guild_id):
+        return discord.utils.get(self.guilds, id=guild_id)
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds:
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+
+    def get_partial_messageable(self, channel_id):
+        return self.get_channel(channel_id)
+
+    def add_cog(self, cog):
+        self._cogs[type(cog).__name__] = cog
+        return cog
+
+    def get_cog(self, name):
+        return self._cogs.get(name)
+
+    async def wait_until_ready(self):
+        return
+
+
+class _FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "Not Found"
@@ -0,0 +1,225 @@
+"""Replay synthetic workloads against the cogs without a Discord connection.
+
+    python bench/run.py                   # every workload at the default size
+    python bench/run.py --scale 5 joins   # only the join raid, five times larger
+
+The real cogs from cogs/ run against the fakes in bench/fakes.py, with a
+throwaway SQLite database in a temporary directory. For each handler the
+report lists calls, wall time, throughput and p50/p99 latency, plus how many
+simulated REST calls were made and how many hit a rate limit.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeBot, FakeGuild, FakeHTTP, FakeInteraction, FakeMessage, FakeReactionPayload, FakeRole  # noqa: E402
+from cogs.automod import AutoModCog  # noqa: E402
+from cogs.moderation import ModerationCog  # noqa: E402
+from cogs.reactionroles import ReactionRolesCog  # noqa: E402
+from cogs.utility import UtilityCog  # noqa: E402
+from polls import CUSTOM_ID_PREFIX, Poll  # noqa: E402
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Recorder:
+    """Collects per-call latencies for one handler"""
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = []
+        self.wall = 0.0
+
+    async def call(self, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+    def row(self):
+        if not self.samples:
+            return f"{self.name:<34} {'-':>7}"
+        rate = len(self.samples) / self.wall if self.wall else 0.0
+        return (f"{self.name:<34} {len(self.samples):>7} {self.wall:>8.2f}s {rate:>10.0f}/s "
+                f"{percentile(self.samples, 0.5) * 1000:>9.2f}ms {percentile(self.samples, 0.99) * 1000:>9.2f}ms")
+
+
+async def run_concurrently(recorder, coros):
+    started = time.perf_counter()
+    await asyncio.gather(*(recorder.call(coro) for coro in coros))
+    recorder.wall = time.perf_counter() - started
+    return recorder
+
+
+class Bench:
+    def __init__(self, bot_module, http, scale):
+        self.bot_module = bot_module
+        self.http = http
+        self.scale = scale
+        self.bot = FakeBot(http)
+        self.guild = self.bot.add_guild(FakeGuild(1000, http))
+        self.guild.add_channel(2000, "welcome")
+        self.general = self.guild.add_channel(2001, "general")
+        self.moderation = self.bot.add_cog(ModerationCog(self.bot))
+        self.reaction_roles = self.bot.add_cog(ReactionRolesCog(self.bot))
+        self.automod = self.bot.add_cog(AutoModCog(self.bot))
+        self.utility = self.bot.add_cog(UtilityCog(self.bot))
+        self._next_id = 10_000
+
+    def new_member(self):
+        self._next_id += 1
+        return self.guild.add_member(self._next_id)
+
+    async def reactions(self):
+        """Reaction storm: most reactions are on unrelated messages"""
+        role = self.guild.add_role(FakeRole(3000, "Notified"))
+        await self.reaction_roles.index_loaded.wait()
+        self.reaction_roles.index[(4000, "🔔")] = role.id
+
+        members = [self.new_member() for _ in range(200 * self.scale)]
+        payloads = [
+            FakeReactionPayload(self.guild, 4000 if random.random() < 0.2 else random.randrange(1, 10 ** 6),
+                                "🔔", random.choice(members))
+            for _ in range(2000 * self.scale)
+        ]
+        return [await run_concurrently(Recorder("on_raw_reaction_add"),
+                                       (self.reaction_roles.on_raw_reaction_add(payload) for payload in payloads))]
+
+    async def warns(self):
+        """Warn flood: many warnings for a few members, including escalations"""
+        members = [self.new_member() for _ in range(50 * self.scale)]
+        recorder = await run_concurrently(Recorder("add_warning + escalate"), (
+            self._warn(random.choice(members)) for _ in range(500 * self.scale)
+        ))
+        await self.bot_module.writer.flush()
+        return [recorder]
+
+    async def _warn(self, member):
+        count, escalation, _ = await self.moderation.add_warning(self.guild, member, self.bot.user.id, "bench")
+        await self.moderation.escalate_warnings(self.guild, member, count, escalation)
+
+    async def joins(self):
+        """Join raid: automod raid detection plus the welcome pipeline"""
+        members = [self.new_member() for _ in range(300 * self.scale)]
+        automod = await run_concurrently(Recorder("automod on_member_join"),
+                                         (self.automod.on_member_join(member) for member in members))
+        welcome = await run_concurrently(Recorder("welcome_batcher.add"),
+                                         (self.bot_module.welcome_batcher.add(member) for member in members))
+        # Let the grouped welcome go out
+        await asyncio.sleep(self.bot_module.welcome_batcher.delay + 0.5)
+        return [automod, welcome]
+
+    async def messages(self):
+        """Message flood: word filter and spam detection on every message"""
+        moderation_messages = [
+            FakeMessage(i, random.choice(self.guild.members or [self.new_member()]), self.general,
+                        random.choice(["hello there", "check this out", "spam spam spam", "gg"]))
+            for i in range(5000 * self.scale)
+        ]
+        return [await run_concurrently(Recorder("automod on_message"),
+                                       (self.automod.on_message(message) for message in moderation_messages))]
+
+    async def mutes(self):
+        """Mute expiry: a backlog of mutes that are all already due"""
+        role = await self.moderation.get_muted_role(self.guild)
+        if role is None:
+            role, _ = await self.moderation.create_muted_role(self.guild)
+        members = [self.new_member() for _ in range(500 * self.scale)]
+        for member in members:
+            member.roles.append(role)
+
+        recorder = Recorder("expire_mute")
+        scheduler = self.moderation.mute_scheduler
+        expire = scheduler.callback
+        remaining = len(members)
+        done = asyncio.Event()
+
+        async def timed(key):
+            nonlocal remaining
+            await recorder.call(expire(key))
+            remaining -= 1
+            if not remaining:
+                done.set()
+
+        scheduler.callback = timed
+        started = time.perf_counter()
+        past = datetime.utcnow() - timedelta(seconds=1)
+        for member in members:
+            scheduler.schedule((member.id, self.guild.id), past)
+        scheduler.start()
+        await done.wait()
+        recorder.wall = time.perf_counter() - started
+        scheduler.callback = expire
+        return [recorder]
+
+    async def polls(self):
+        """Poll rush: thousands of button votes, some changed or withdrawn, on a few polls"""
+        tracker = self.bot_module.polls
+        for message_id in (5000, 5001, 5002):
+            await tracker.create(Poll(message_id, self.general.id, self.guild.id, self.bot.user.id,
+                                      "Bench poll?", ["yes", "no", "maybe", "later"]))
+
+        members = [self.new_member() for _ in range(2000 * self.scale)]
+        interactions = [
+            FakeInteraction(random.choice((5000, 5001, 5002)), f"{CUSTOM_ID_PREFIX}{random.randrange(4)}",
+                            random.choice(members))
+            for _ in range(5000 * self.scale)
+        ]
+        votes = await run_concurrently(Recorder("poll vote (on_interaction)"),
+                                       (self.utility.on_interaction(interaction) for interaction in interactions))
+        # Let the debounced edits go out, then close every poll
+        await asyncio.sleep(tracker.edit_delay + 0.5)
+        ends = await run_concurrently(Recorder("polls.end"), (tracker.end(message_id) for message_id in (5000, 5001, 5002)))
+        return [votes, ends]
+
+
+WORKLOADS = ("reactions", "warns", "joins", "messages", "mutes", "polls")
+
+
+async def main(args):
+    # bot.py writes bot.log and bot_data.db to the working directory
+    workdir = tempfile.mkdtemp(prefix="bot-bench-")
+    os.chdir(workdir)
+    import bot as bot_module
+
+    logging.getLogger().setLevel(logging.WARNING)
+    http = FakeHTTP(latency=args.latency / 1000, route_limit=args.route_limit, global_limit=args.global_limit)
+    bench = Bench(bot_module, http, args.scale)
+
+    print(f"{'handler':<34} {'calls':>7} {'wall':>9} {'throughput':>12} {'p50':>11} {'p99':>11}")
+    for name in args.workloads or WORKLOADS:
+        requests, limited = http.requests, http.rate_limited
+        for recorder in await getattr(bench, name)():
+            print(recorder.row())
+        print(f"  {name}: {http.requests - requests} REST calls, {http.rate_limited - limited} rate limited")
+
+    await bot_module.polls.close()
+    await bot_module.writer.close()
+    await bot_module.db.close()
+    print(f"(database and logs in {workdir})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the bot's handlers")
+    parser.add_argument("workloads", nargs="*", choices=[[], *WORKLOADS], default=[],
+                        help="workloads to run (default: all)")
+    parser.add_argument("--scale", type=int, default=1, help="multiply every workload's size")
+    parser.add_argument("--latency", type=float, default=2.0, help="simulated REST latency in ms")
+    parser.add_argument("--route-limit", type=int, default=50, help="requests per route per second")
+    parser.add_argument("--global-limit", type=int, default=200, help="requests per second overall")
+    random.seed(1)
+    asyncio.run(main(parser.parse_args()))
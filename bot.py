@@ -1,13 +1,23 @@
+# Created first so the startup report covers importing discord and the rest
+from startup import StartupTimer
+startup = StartupTimer()
+
 import discord
-from discord.ext import commands, tasks
-import asyncio
+from discord.ext import commands
 import json
-import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 import os
 from typing import Optional
 from dotenv import load_dotenv
+from storage import db, writer
+from guildstats import StatsTracker
+from logsetup import setup_logging
+from welcome import WelcomeBatcher
+from modlog import embed_batches
+from shards import shard_options
+from metrics import Metrics
+from shared import PREFIX, cluster, guild_config, member_cache, mod_log, polls, shard_metrics
 load_dotenv()
 
 BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN") 
@@ -17,635 +27,67 @@ debug_mode = os.getenv("DEBUG")
 print(f"BOT_TOKEN: {BOT_TOKEN}")
 print(f"Debug Mode: {debug_mode}")
 
-# Configure logging
-logging.basicConfig(
+# Configure logging (LOG_FORMAT=json for one JSON object per line)
+setup_logging(
+    path='bot.log',
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
+    json_format=os.getenv("LOG_FORMAT", "").lower() == "json",
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+    backup_count=int(os.getenv("LOG_BACKUPS", 5))
 )
 logger = logging.getLogger(__name__)
 
 # Bot configuration
 BOT_TOKEN = "" 
-OWNER_ID =   
-PREFIX = '!'
-
-# Database setup
-def init_database():
-    conn = sqlite3.connect('bot_data.db')
-    cursor = conn.cursor()
-    
-    # Warnings table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS warnings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            guild_id INTEGER,
-            moderator_id INTEGER,
-            reason TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Reaction roles table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reaction_roles (
-            message_id INTEGER,
-            emoji TEXT,
-            role_id INTEGER,
-            guild_id INTEGER,
-            PRIMARY KEY (message_id, emoji)
-        )
-    ''')
-    
-    # Muted users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS muted_users (
-            user_id INTEGER,
-            guild_id INTEGER,
-            unmute_time DATETIME,
-            PRIMARY KEY (user_id, guild_id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+OWNER_ID = int(os.getenv("OWNER_ID", 0))
 
-# Initialize database
-init_database()
+# Cogs live in cogs/ and are loaded as extensions so /reload can swap one at a time
+EXTENSIONS = {
+    "moderation": "cogs.moderation",
+    "utility": "cogs.utility",
+    "services": "cogs.services",
+    "reactionroles": "cogs.reactionroles",
+    "automod": "cogs.automod",
+}
 
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 intents.reactions = True
+# Needed for the online/idle/dnd counts in /stats
+intents.presences = True
 
-bot = commands.Bot(command_prefix=PREFIX, intents=intents, help_command=None)
-
-# Service pricing data
-SERVICES = {
-    "logo_design": {
-        "name": "Logo Design",
-        "price": "$150 - $300",
-        "description": "Professional logo design with 3 revisions included",
-        "image": "https://via.placeholder.com/400x300/7289da/ffffff?text=Logo+Design",
-        "delivery": "3-5 business days"
-    },
-    "banner_design": {
-        "name": "Banner/Header Design",
-        "price": "$75 - $150",
-        "description": "Custom banners for social media, websites, or Discord servers",
-        "image": "https://via.placeholder.com/400x300/43b581/ffffff?text=Banner+Design",
-        "delivery": "1-3 business days"
-    },
-    "business_card": {
-        "name": "Business Card Design",
-        "price": "$50 - $100",
-        "description": "Professional business card design with print-ready files",
-        "image": "https://via.placeholder.com/400x300/faa61a/ffffff?text=Business+Card",
-        "delivery": "2-4 business days"
-    },
-    "branding_package": {
-        "name": "Complete Branding Package",
-        "price": "$500 - $1000",
-        "description": "Logo, business cards, letterhead, and brand guidelines",
-        "image": "https://via.placeholder.com/400x300/f04747/ffffff?text=Branding+Package",
-        "delivery": "7-10 business days"
-    }
-}
+async def get_prefix(bot, message):
+    if message.guild is None:
+        return PREFIX
+    return await guild_config.get(message.guild.id, "prefix", PREFIX)
 
-class ModerationCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.check_mutes.start()
-    
-    def cog_unload(self):
-        self.check_mutes.cancel()
-    
-    @tasks.loop(minutes=1)
-    async def check_mutes(self):
-        """Check for expired mutes"""
-        conn = sqlite3.connect('bot_data.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT user_id, guild_id FROM muted_users 
-            WHERE unmute_time <= datetime('now')
-        ''')
-        
-        expired_mutes = cursor.fetchall()
-        
-        for user_id, guild_id in expired_mutes:
-            guild = self.bot.get_guild(guild_id)
-            if guild:
-                member = guild.get_member(user_id)
-                if member:
-                    muted_role = discord.utils.get(guild.roles, name="Muted")
-                    if muted_role and muted_role in member.roles:
-                        await member.remove_roles(muted_role)
-        
-        cursor.execute('DELETE FROM muted_users WHERE unmute_time <= datetime("now")')
-        conn.commit()
-        conn.close()
-    
-    @check_mutes.before_loop
-    async def before_check_mutes(self):
-        await self.bot.wait_until_ready()
-    
-    @commands.slash_command(name="ban", description="Ban a user from the server")
-    @commands.has_permissions(ban_members=True)
-    async def ban(self, ctx, member: discord.Member, *, reason: str = "No reason provided"):
-        try:
-            await member.ban(reason=f"{ctx.author}: {reason}")
-            
-            embed = discord.Embed(
-                title="🔨 User Banned",
-                color=discord.Color.red(),
-                timestamp=datetime.utcnow()
-            )
-            embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
-            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-            embed.add_field(name="Reason", value=reason, inline=True)
-            embed.set_footer(text=f"ID: {member.id}")
-            
-            await ctx.respond(embed=embed)
-            logger.info(f"{ctx.author} banned {member} for: {reason}")
-            
-        except discord.Forbidden:
-            await ctx.respond("❌ I don't have permission to ban this user.", ephemeral=True)
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.slash_command(name="kick", description="Kick a user from the server")
-    @commands.has_permissions(kick_members=True)
-    async def kick(self, ctx, member: discord.Member, *, reason: str = "No reason provided"):
-        try:
-            await member.kick(reason=f"{ctx.author}: {reason}")
-            
-            embed = discord.Embed(
-                title="👢 User Kicked",
-                color=discord.Color.orange(),
-                timestamp=datetime.utcnow()
-            )
-            embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
-            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-            embed.add_field(name="Reason", value=reason, inline=True)
-            embed.set_footer(text=f"ID: {member.id}")
-            
-            await ctx.respond(embed=embed)
-            logger.info(f"{ctx.author} kicked {member} for: {reason}")
-            
-        except discord.Forbidden:
-            await ctx.respond("❌ I don't have permission to kick this user.", ephemeral=True)
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.slash_command(name="mute", description="Mute a user for a specific duration")
-    @commands.has_permissions(manage_roles=True)
-    async def mute(self, ctx, member: discord.Member, duration: str, *, reason: str = "No reason provided"):
-        try:
-            # Parse duration (e.g., "1h", "30m", "1d")
-            time_units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
-            duration_seconds = 0
-            
-            if duration[-1] in time_units:
-                duration_seconds = int(duration[:-1]) * time_units[duration[-1]]
-            else:
-                await ctx.respond("❌ Invalid duration format. Use s/m/h/d (e.g., 1h, 30m)", ephemeral=True)
-                return
-            
-            # Get or create muted role
-            muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
-            if not muted_role:
-                muted_role = await ctx.guild.create_role(name="Muted", color=discord.Color.dark_grey())
-                
-                # Set permissions for muted role
-                for channel in ctx.guild.channels:
-                    await channel.set_permissions(muted_role, send_messages=False, speak=False)
-            
-            await member.add_roles(muted_role)
-            
-            # Store mute in database
-            unmute_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
-            conn = sqlite3.connect('bot_data.db')
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO muted_users (user_id, guild_id, unmute_time)
-                VALUES (?, ?, ?)
-            ''', (member.id, ctx.guild.id, unmute_time))
-            conn.commit()
-            conn.close()
-            
-            embed = discord.Embed(
-                title="🔇 User Muted",
-                color=discord.Color.dark_grey(),
-                timestamp=datetime.utcnow()
-            )
-            embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
-            embed.add_field(name="Duration", value=duration, inline=True)
-            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-            embed.add_field(name="Reason", value=reason, inline=False)
-            embed.set_footer(text=f"ID: {member.id}")
-            
-            await ctx.respond(embed=embed)
-            
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.slash_command(name="unmute", description="Remove mute from a user")
-    @commands.has_permissions(manage_roles=True)
-    async def unmute(self, ctx, member: discord.Member):
-        try:
-            muted_role = discord.utils.get(ctx.guild.roles, name="Muted")
-            if muted_role and muted_role in member.roles:
-                await member.remove_roles(muted_role)
-                
-                # Remove from database
-                conn = sqlite3.connect('bot_data.db')
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM muted_users WHERE user_id = ? AND guild_id = ?',
-                             (member.id, ctx.guild.id))
-                conn.commit()
-                conn.close()
-                
-                embed = discord.Embed(
-                    title="🔊 User Unmuted",
-                    color=discord.Color.green(),
-                    timestamp=datetime.utcnow()
-                )
-                embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
-                embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-                
-                await ctx.respond(embed=embed)
-            else:
-                await ctx.respond("❌ This user is not muted.", ephemeral=True)
-                
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.slash_command(name="warn", description="Warn a user and log the warning")
-    @commands.has_permissions(manage_messages=True)
-    async def warn(self, ctx, member: discord.Member, *, reason: str):
-        conn = sqlite3.connect('bot_data.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO warnings (user_id, guild_id, moderator_id, reason)
-            VALUES (?, ?, ?, ?)
-        ''', (member.id, ctx.guild.id, ctx.author.id, reason))
-        
-        cursor.execute('''
-            SELECT COUNT(*) FROM warnings WHERE user_id = ? AND guild_id = ?
-        ''', (member.id, ctx.guild.id))
-        
-        warning_count = cursor.fetchone()[0]
-        conn.commit()
-        conn.close()
-        
-        embed = discord.Embed(
-            title="⚠️ User Warned",
-            color=discord.Color.yellow(),
-            timestamp=datetime.utcnow()
-        )
-        embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
-        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-        embed.add_field(name="Warning Count", value=f"{warning_count}", inline=True)
-        embed.add_field(name="Reason", value=reason, inline=False)
-        embed.set_footer(text=f"ID: {member.id}")
-        
-        await ctx.respond(embed=embed)
-        
-        # Try to DM the user
-        try:
-            dm_embed = discord.Embed(
-                title="⚠️ You have been warned",
-                description=f"You have been warned in **{ctx.guild.name}**",
-                color=discord.Color.yellow()
-            )
-            dm_embed.add_field(name="Reason", value=reason, inline=False)
-            dm_embed.add_field(name="Total Warnings", value=f"{warning_count}", inline=True)
-            await member.send(embed=dm_embed)
-        except:
-            pass
-    
-    @commands.slash_command(name="clear", description="Delete a number of messages from the channel")
-    @commands.has_permissions(manage_messages=True)
-    async def clear(self, ctx, amount: int):
-        if amount < 1 or amount > 100:
-            await ctx.respond("❌ Amount must be between 1 and 100.", ephemeral=True)
-            return
-        
-        try:
-            deleted = await ctx.channel.purge(limit=amount)
-            
-            embed = discord.Embed(
-                title="🧹 Messages Cleared",
-                description=f"Deleted {len(deleted)} messages",
-                color=discord.Color.green(),
-                timestamp=datetime.utcnow()
-            )
-            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-            embed.add_field(name="Channel", value=ctx.channel.mention, inline=True)
-            
-            await ctx.respond(embed=embed, delete_after=5)
-            
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.slash_command(name="lock", description="Lock the channel (remove send permissions)")
-    @commands.has_permissions(manage_channels=True)
-    async def lock(self, ctx):
-        try:
-            await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=False)
-            
-            embed = discord.Embed(
-                title="🔒 Channel Locked",
-                description=f"{ctx.channel.mention} has been locked",
-                color=discord.Color.red(),
-                timestamp=datetime.utcnow()
-            )
-            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-            
-            await ctx.respond(embed=embed)
-            
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.slash_command(name="unlock", description="Unlock the channel (restore send permissions)")
-    @commands.has_permissions(manage_channels=True)
-    async def unlock(self, ctx):
-        try:
-            await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=None)
-            
-            embed = discord.Embed(
-                title="🔓 Channel Unlocked",
-                description=f"{ctx.channel.mention} has been unlocked",
-                color=discord.Color.green(),
-                timestamp=datetime.utcnow()
-            )
-            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
-            
-            await ctx.respond(embed=embed)
-            
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-
-class UtilityCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-    
-    @commands.slash_command(name="say", description="Bot repeats your message")
-    @commands.has_permissions(manage_messages=True)
-    async def say(self, ctx, *, message: str):
-        await ctx.channel.send(message)
-        await ctx.respond("✅ Message sent!", ephemeral=True)
-    
-    @commands.slash_command(name="poll", description="Create a poll with options")
-    async def poll(self, ctx, question: str, options: str):
-        option_list = [opt.strip() for opt in options.split(',')]
-        
-        if len(option_list) < 2 or len(option_list) > 10:
-            await ctx.respond("❌ Please provide 2-10 options separated by commas.", ephemeral=True)
-            return
-        
-        embed = discord.Embed(
-            title="📊 Poll",
-            description=question,
-            color=discord.Color.blue(),
-            timestamp=datetime.utcnow()
-        )
-        
-        reactions = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣', '🔟']
-        
-        for i, option in enumerate(option_list):
-            embed.add_field(name=f"{reactions[i]} {option}", value="\u200b", inline=False)
-        
-        embed.set_footer(text=f"Poll by {ctx.author}", icon_url=ctx.author.avatar.url if ctx.author.avatar else None)
-        
-        await ctx.respond("Poll created!", ephemeral=True)
-        message = await ctx.followup.send(embed=embed)
-        
-        for i in range(len(option_list)):
-            await message.add_reaction(reactions[i])
-    
-    @commands.slash_command(name="giveaway", description="Start a giveaway")
-    @commands.has_permissions(manage_messages=True)
-    async def giveaway(self, ctx, duration: str, *, prize: str):
-        # Parse duration
-        time_units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
-        duration_seconds = 0
-        
-        if duration[-1] in time_units:
-            duration_seconds = int(duration[:-1]) * time_units[duration[-1]]
-        else:
-            await ctx.respond("❌ Invalid duration format. Use s/m/h/d (e.g., 1h, 30m)", ephemeral=True)
-            return
-        
-        end_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
-        
-        embed = discord.Embed(
-            title="🎉 GIVEAWAY! 🎉",
-            description=f"**Prize:** {prize}\n\n**How to enter:** React with 🎉\n**Ends:** <t:{int(end_time.timestamp())}:R>",
-            color=discord.Color.gold(),
-            timestamp=end_time
-        )
-        embed.set_footer(text="Ends at")
-        
-        await ctx.respond("Giveaway started!", ephemeral=True)
-        message = await ctx.followup.send(embed=embed)
-        await message.add_reaction("🎉")
-        
-        # Schedule giveaway end (simplified - in production, use a proper task scheduler)
-        await asyncio.sleep(duration_seconds)
-        
-        # Get updated message
-        try:
-            message = await ctx.channel.fetch_message(message.id)
-            reaction = discord.utils.get(message.reactions, emoji="🎉")
-            
-            if reaction and reaction.count > 1:
-                users = [user async for user in reaction.users() if not user.bot]
-                if users:
-                    import random
-                    winner = random.choice(users)
-                    
-                    embed = discord.Embed(
-                        title="🎉 Giveaway Ended! 🎉",
-                        description=f"**Winner:** {winner.mention}\n**Prize:** {prize}",
-                        color=discord.Color.gold()
-                    )
-                    await ctx.followup.send(embed=embed)
-                else:
-                    await ctx.followup.send("❌ No valid entries for the giveaway.")
-            else:
-                await ctx.followup.send("❌ No one entered the giveaway.")
-        except:
-            pass
-    
-    @commands.slash_command(name="botinfo", description="Shows information about the bot")
-    async def botinfo(self, ctx):
-        embed = discord.Embed(
-            title="🤖 Bot Information",
-            color=discord.Color.blue(),
-            timestamp=datetime.utcnow()
-        )
-        
-        embed.add_field(name="Bot Name", value=self.bot.user.name, inline=True)
-        embed.add_field(name="Bot ID", value=self.bot.user.id, inline=True)
-        embed.add_field(name="Created", value=f"<t:{int(self.bot.user.created_at.timestamp())}:F>", inline=True)
-        embed.add_field(name="Servers", value=len(self.bot.guilds), inline=True)
-        embed.add_field(name="Users", value=len(self.bot.users), inline=True)
-        embed.add_field(name="Python Version", value="3.8+", inline=True)
-        embed.add_field(name="Discord.py Version", value=discord.__version__, inline=True)
-        embed.add_field(name="Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
-        
-        embed.set_thumbnail(url=self.bot.user.avatar.url if self.bot.user.avatar else None)
-        embed.set_footer(text="Professional Discord Bot for Graphic Design Services")
-        
-        await ctx.respond(embed=embed)
+# Shard count and the shards this process runs come from SHARD_COUNT / SHARD_IDS
+bot = commands.AutoShardedBot(command_prefix=get_prefix, intents=intents, help_command=None,
+                              **shard_options(), **member_cache.bot_options())
 
-class ServicesCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-    
-    @commands.slash_command(name="services", description="Display available graphic design services")
-    async def services(self, ctx):
-        embed = discord.Embed(
-            title="🎨 Graphic Design Services",
-            description="Professional design services available",
-            color=discord.Color.purple(),
-            timestamp=datetime.utcnow()
-        )
-        
-        for service_key, service in SERVICES.items():
-            embed.add_field(
-                name=f"{service['name']} - {service['price']}",
-                value=f"{service['description']}\n⏱️ {service['delivery']}",
-                inline=False
-            )
-        
-        embed.set_footer(text="Use /service [name] for detailed information about a specific service")
-        await ctx.respond(embed=embed)
-    
-    @commands.slash_command(name="service", description="Get detailed information about a specific service")
-    async def service_detail(self, ctx, service_name: str):
-        # Find service by name (case insensitive partial match)
-        service = None
-        service_key = None
-        
-        for key, svc in SERVICES.items():
-            if service_name.lower() in svc['name'].lower() or service_name.lower() in key.lower():
-                service = svc
-                service_key = key
-                break
-        
-        if not service:
-            available_services = ", ".join([svc['name'] for svc in SERVICES.values()])
-            await ctx.respond(f"❌ Service not found. Available services: {available_services}", ephemeral=True)
-            return
-        
-        embed = discord.Embed(
-            title=f"🎨 {service['name']}",
-            description=service['description'],
-            color=discord.Color.purple(),
-            timestamp=datetime.utcnow()
-        )
-        
-        embed.add_field(name="💰 Pricing", value=service['price'], inline=True)
-        embed.add_field(name="⏱️ Delivery Time", value=service['delivery'], inline=True)
-        embed.add_field(name="📞 Contact", value="DM for quotes and inquiries", inline=True)
-        
-        embed.set_image(url=service['image'])
-        embed.set_footer(text="Professional graphic design services • High quality guaranteed")
-        
-        await ctx.respond(embed=embed)
+startup.install(bot, db)
 
-class ReactionRolesCog(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-    
-    @commands.slash_command(name="reactionrole", description="Set up reaction roles")
-    @commands.has_permissions(manage_roles=True)
-    async def setup_reaction_role(self, ctx, message_id: str, emoji: str, role: discord.Role):
-        try:
-            message_id_int = int(message_id)
-            message = await ctx.channel.fetch_message(message_id_int)
-            
-            # Add reaction to the message
-            await message.add_reaction(emoji)
-            
-            # Store in database
-            conn = sqlite3.connect('bot_data.db')
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO reaction_roles (message_id, emoji, role_id, guild_id)
-                VALUES (?, ?, ?, ?)
-            ''', (message_id_int, emoji, role.id, ctx.guild.id))
-            conn.commit()
-            conn.close()
-            
-            embed = discord.Embed(
-                title="✅ Reaction Role Set",
-                description=f"Reaction {emoji} will give role {role.mention}",
-                color=discord.Color.green()
-            )
-            await ctx.respond(embed=embed, ephemeral=True)
-            
-        except discord.NotFound:
-            await ctx.respond("❌ Message not found.", ephemeral=True)
-        except ValueError:
-            await ctx.respond("❌ Invalid message ID.", ephemeral=True)
-        except Exception as e:
-            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
-    
-    @commands.Cog.listener()
-    async def on_reaction_add(self, reaction, user):
-        if user.bot:
-            return
-        
-        conn = sqlite3.connect('bot_data.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT role_id FROM reaction_roles 
-            WHERE message_id = ? AND emoji = ? AND guild_id = ?
-        ''', (reaction.message.id, str(reaction.emoji), reaction.message.guild.id))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            role = reaction.message.guild.get_role(result[0])
-            if role:
-                try:
-                    await user.add_roles(role)
-                except discord.Forbidden:
-                    pass
-    
-    @commands.Cog.listener()
-    async def on_reaction_remove(self, reaction, user):
-        if user.bot:
-            return
-        
-        conn = sqlite3.connect('bot_data.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT role_id FROM reaction_roles 
-            WHERE message_id = ? AND emoji = ? AND guild_id = ?
-        ''', (reaction.message.id, str(reaction.emoji), reaction.message.guild.id))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            role = reaction.message.guild.get_role(result[0])
-            if role:
-                try:
-                    await user.remove_roles(role)
-                except discord.Forbidden:
-                    pass
+@cluster.handler("stats")
+async def cluster_stats(payload):
+    return {"guilds": len(bot.guilds), "users": len(bot.users), "shards": len(bot.shards)}
+
+# Prometheus metrics, only wired in when METRICS_PORT is set
+METRICS_PORT = os.getenv("METRICS_PORT")
+metrics = Metrics()
+if METRICS_PORT:
+    metrics.install(bot, db)
+
+    @metrics.collector
+    def collect_bot_gauges():
+        metrics.guilds.set(value=len(bot.guilds))
+        for shard_id, latency in bot.latencies:
+            metrics.latency.set(shard_id, value=latency)
+        metrics.pending_writes.set(value=len(writer))
+
+# Member counts for /stats and /serverinfo, maintained from gateway events
+stats_tracker = StatsTracker(ttl=30)
 
 # Event handlers
 @bot.event
@@ -657,13 +99,95 @@ async def on_ready():
     activity = discord.Activity(type=discord.ActivityType.watching, name="for design requests | /services")
     await bot.change_presence(activity=activity)
 
-@bot.event
-async def on_member_join(member):
-    """Welcome new members"""
-    # Find welcome channel (customize channel name as needed)
-    welcome_channel = discord.utils.get(member.guild.channels, name='welcome') or \
-                     discord.utils.get(member.guild.channels, name='general') or \
-                     member.guild.system_channel
+    shard_metrics.start(bot)
+    member_cache.start(bot)
+    await cluster.start()
+    if metrics.enabled:
+        # Each cluster process gets its own port
+        await metrics.serve(os.getenv("METRICS_HOST", "127.0.0.1"), int(METRICS_PORT) + (cluster.cluster_id or 0))
+
+    # Resync counts in case events were missed while disconnected
+    for guild in bot.guilds:
+        stats_tracker.rebuild(guild)
+
+@bot.listen()
+async def on_shard_connect(shard_id):
+    shard_metrics.connected(shard_id)
+
+@bot.listen()
+async def on_shard_disconnect(shard_id):
+    shard_metrics.disconnected(shard_id)
+
+@bot.listen()
+async def on_shard_resumed(shard_id):
+    shard_metrics.resumed(shard_id)
+    logger.info(f"Shard {shard_id} resumed")
+
+@bot.listen()
+async def on_guild_join(guild):
+    stats_tracker.rebuild(guild)
+
+@bot.listen()
+async def on_guild_remove(guild):
+    stats_tracker.forget(guild.id)
+    guild_config.invalidate(guild.id)
+    welcome_batcher.forget(guild.id)
+
+@bot.listen()
+async def on_guild_role_delete(role):
+    await guild_config.forget_id(role.guild.id, role.id)
+
+@bot.listen()
+async def on_guild_channel_delete(channel):
+    await guild_config.forget_id(channel.guild.id, channel.id)
+
+@bot.listen("on_member_join")
+async def track_member_join(member):
+    stats_tracker.member_join(member)
+
+def protected_roles():
+    """Role IDs whose members stay cached with MEMBER_CACHE=active"""
+    roles = set()
+    reaction_roles = bot.get_cog("ReactionRolesCog")
+    if reaction_roles is not None:
+        roles.update(reaction_roles.index.values())
+    for guild in bot.guilds:
+        settings = guild_config.cached(guild.id)
+        if settings and "muted_role" in settings:
+            roles.add(settings["muted_role"])
+    return roles
+
+member_cache.protected_roles = protected_roles
+
+if member_cache.enabled:
+    @bot.listen("on_message")
+    async def track_member_activity(message):
+        if message.guild is not None:
+            member_cache.message(message)
+
+@bot.listen()
+async def on_member_remove(member):
+    stats_tracker.member_remove(member)
+
+@bot.listen()
+async def on_presence_update(before, after):
+    stats_tracker.presence_update(before, after)
+
+async def get_welcome_channel(guild):
+    channel_id = await guild_config.get(guild.id, "welcome_channel")
+    if channel_id is not None:
+        return guild.get_channel(channel_id)
+
+    # Not configured yet: pick a channel by name once and remember its ID
+    channel = discord.utils.get(guild.text_channels, name='welcome') or \
+              discord.utils.get(guild.text_channels, name='general') or \
+              guild.system_channel
+    if channel is not None:
+        await guild_config.set(guild.id, "welcome_channel", channel.id)
+    return channel
+
+async def send_welcome(member):
+    welcome_channel = await get_welcome_channel(member.guild)
     
     if welcome_channel:
         embed = discord.Embed(
@@ -686,13 +210,61 @@ async def on_member_join(member):
         )
         
         embed.set_thumbnail(url=member.avatar.url if member.avatar else None)
-        embed.set_footer(text=f"Member #{len(member.guild.members)}")
+        embed.set_footer(text=f"Member #{member.guild.member_count}")
         
         try:
             await welcome_channel.send(embed=embed)
         except discord.Forbidden:
             pass
 
+async def send_group_welcome(guild, members):
+    """One message welcoming everyone who joined during a burst"""
+    welcome_channel = await get_welcome_channel(guild)
+    if not welcome_channel:
+        return
+
+    # Embed descriptions hold 4096 characters, split the mentions to fit
+    groups = [[]]
+    length = 0
+    for member in members:
+        if length + len(member.mention) + 2 > 3900:
+            groups.append([])
+            length = 0
+        groups[-1].append(member.mention)
+        length += len(member.mention) + 2
+
+    embeds = []
+    for index, group in enumerate(groups):
+        embed = discord.Embed(description=", ".join(group), color=discord.Color.purple())
+        if index == 0:
+            embed.title = f"🎨 Welcome to the Server, {len(members)} new members!"
+            embed.timestamp = datetime.utcnow()
+        embeds.append(embed)
+
+    embeds[-1].add_field(
+        name="🔍 Check out our services",
+        value="Use `/services` to see our graphic design offerings",
+        inline=False
+    )
+    embeds[-1].set_footer(text=f"Member #{guild.member_count}")
+
+    # Each message holds 10 embeds and 6000 characters between them
+    for batch in embed_batches(embeds):
+        try:
+            await welcome_channel.send(embeds=batch)
+        except discord.Forbidden:
+            return
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to send a group welcome in guild {guild.id}: {e}")
+
+# Joins beyond 5 in 10 seconds are welcomed together 5 seconds later
+welcome_batcher = WelcomeBatcher(send_welcome, send_group_welcome, threshold=5, window=10, delay=5.0)
+
+@bot.event
+async def on_member_join(member):
+    """Welcome new members"""
+    await welcome_batcher.add(member)
+
 @bot.event
 async def on_application_command_error(ctx, error):
     """Global error handler for slash commands"""
@@ -706,11 +278,14 @@ async def on_application_command_error(ctx, error):
         logger.error(f"Unhandled error in {ctx.command}: {error}")
         await ctx.respond("❌ An unexpected error occurred. Please try again later.", ephemeral=True)
 
-# Add cogs
-bot.add_cog(ModerationCog(bot))
-bot.add_cog(UtilityCog(bot))
-bot.add_cog(ServicesCog(bot))
-bot.add_cog(ReactionRolesCog(bot))
+# Load cogs; a cog that fails to import is logged and skipped instead of keeping the bot down
+startup.mark("import")
+for extension in EXTENSIONS.values():
+    try:
+        bot.load_extension(extension)
+    except discord.ExtensionError as e:
+        logger.error(f"Failed to load {extension}: {e}")
+startup.mark("extensions")
 
 # Help command
 @bot.slash_command(name="help", description="Show all available commands")
@@ -725,20 +300,38 @@ async def help_command(ctx):
     # Moderation Commands
     mod_commands = [
         "`/ban [user] [reason]` - Ban a user from the server",
-        "`/kick [user] [reason]` - Kick a user from the server", 
+        "`/kick [user] [reason]` - Kick a user from the server",
+        "`/massban [ids|joined_within|name_pattern]` - Ban many users at once",
+        "`/masskick [ids|joined_within|name_pattern]` - Kick many members at once",
         "`/mute [user] [duration] [reason]` - Mute a user for specific time",
         "`/unmute [user]` - Remove mute from a user",
         "`/warn [user] [reason]` - Warn a user and log it",
+        "`/warnings [user]` - List a user's warnings",
+        "`/delwarn [id]` - Delete a single warning",
+        "`/clearwarns [user]` - Delete all of a user's warnings",
+        "`/case [number]` - Show a moderation case",
+        "`/history [user] [search]` - Search moderation cases",
+        "`/modlog [channel]` - Set the moderation log channel",
+        "`/config [settings]` - Show or change server settings",
         "`/clear [amount]` - Delete messages from channel",
+        "`/purge [amount] [filters]` - Delete matching messages across channels",
         "`/lock` - Lock the current channel",
         "`/unlock` - Unlock the current channel"
     ]
     embed.add_field(name="🛡️ Moderation", value="\n".join(mod_commands), inline=False)
     
+    # AutoMod Commands
+    automod_commands = [
+        "`/filteradd [term] [kind]` - Add a banned word or link",
+        "`/filterremove [term]` - Remove a banned word or link",
+        "`/filterlist` - Show the banned words and links"
+    ]
+    embed.add_field(name="🤖 AutoMod", value="\n".join(automod_commands), inline=False)
+    
     # Utility Commands
     util_commands = [
         "`/say [message]` - Bot repeats your message",
-        "`/poll [question] [options]` - Create a poll",
+        "`/poll [question] [options] [duration]` - Create a poll with live results",
         "`/giveaway [duration] [prize]` - Start a giveaway",
         "`/botinfo` - Show bot information"
     ]
@@ -760,21 +353,6 @@ async def help_command(ctx):
     embed.set_footer(text="Professional Discord Bot • Use slash commands")
     await ctx.respond(embed=embed)
 
-# Additional utility functions
-def parse_time(time_str):
-    """Parse time string like '1h30m' into seconds"""
-    import re
-    time_regex = re.compile(r'(\d+)([dhms])')
-    matches = time_regex.findall(time_str.lower())
-    
-    total_seconds = 0
-    time_units = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}
-    
-    for amount, unit in matches:
-        total_seconds += int(amount) * time_units.get(unit, 0)
-    
-    return total_seconds
-
 # Owner-only commands
 @bot.slash_command(name="shutdown", description="Shutdown the bot (Owner only)")
 async def shutdown(ctx):
@@ -788,41 +366,39 @@ async def shutdown(ctx):
         color=discord.Color.red()
     )
     await ctx.respond(embed=embed)
+    # Flush queued moderation writes and poll votes before the event loop goes away
+    await polls.close()
+    await writer.close()
+    await mod_log.close()
+    await cluster.close()
+    await metrics.close()
+    await db.close()
     await bot.close()
 
 @bot.slash_command(name="reload", description="Reload bot cogs (Owner only)")
-async def reload_cogs(ctx):
+async def reload_cogs(ctx, cog: discord.Option(str, "Only reload this cog", choices=list(EXTENSIONS), required=False) = None):
     if ctx.author.id != OWNER_ID:
         await ctx.respond("❌ Only the bot owner can use this command.", ephemeral=True)
         return
     
+    names = [cog] if cog else list(EXTENSIONS)
     try:
-        # Remove and re-add cogs
-        bot.remove_cog("ModerationCog")
-        bot.remove_cog("UtilityCog") 
-        bot.remove_cog("ServicesCog")
-        bot.remove_cog("ReactionRolesCog")
-        
-        bot.add_cog(ModerationCog(bot))
-        bot.add_cog(UtilityCog(bot))
-        bot.add_cog(ServicesCog(bot))
-        bot.add_cog(ReactionRolesCog(bot))
+        for name in names:
+            extension = EXTENSIONS[name]
+            # Picks up a cog that failed to load at startup as well
+            if extension in bot.extensions:
+                bot.reload_extension(extension)
+            else:
+                bot.load_extension(extension)
+        # Reloaded commands need their IDs from Discord again before they can be invoked
+        await bot.sync_commands()
         
-        await ctx.respond("✅ Cogs reloaded successfully!", ephemeral=True)
+        await ctx.respond(f"✅ Reloaded {', '.join(names)}!", ephemeral=True)
     except Exception as e:
         await ctx.respond(f"❌ Error reloading cogs: {str(e)}", ephemeral=True)
 
 # Statistics command
-@bot.slash_command(name="stats", description="Show server statistics")
-async def stats(ctx):
-    guild = ctx.guild
-    
-    # Count members by status
-    online = len([m for m in guild.members if m.status == discord.Status.online])
-    idle = len([m for m in guild.members if m.status == discord.Status.idle])
-    dnd = len([m for m in guild.members if m.status == discord.Status.dnd])
-    offline = len([m for m in guild.members if m.status == discord.Status.offline])
-    
+def build_stats_embed(guild, presence_count=None):
     embed = discord.Embed(
         title=f"📊 {guild.name} Statistics",
         color=discord.Color.blue(),
@@ -830,10 +406,14 @@ async def stats(ctx):
     )
     
     embed.add_field(name="👥 Total Members", value=guild.member_count, inline=True)
-    embed.add_field(name="🟢 Online", value=online, inline=True)
-    embed.add_field(name="🟡 Idle", value=idle, inline=True)
-    embed.add_field(name="🔴 DND", value=dnd, inline=True)
-    embed.add_field(name="⚫ Offline", value=offline, inline=True)
+    if presence_count is None:
+        counts = stats_tracker.get(guild).statuses
+        embed.add_field(name="🟢 Online", value=counts["online"], inline=True)
+        embed.add_field(name="🟡 Idle", value=counts["idle"], inline=True)
+        embed.add_field(name="🔴 DND", value=counts["dnd"], inline=True)
+        embed.add_field(name="⚫ Offline", value=counts["offline"], inline=True)
+    else:
+        embed.add_field(name="🟢 Online", value=presence_count, inline=True)
     embed.add_field(name="📁 Channels", value=len(guild.channels), inline=True)
     embed.add_field(name="📝 Text Channels", value=len(guild.text_channels), inline=True)
     embed.add_field(name="🔊 Voice Channels", value=len(guild.voice_channels), inline=True)
@@ -846,6 +426,19 @@ async def stats(ctx):
         embed.set_thumbnail(url=guild.icon.url)
     
     embed.set_footer(text=f"Server ID: {guild.id}")
+    return embed
+
+@bot.slash_command(name="stats", description="Show server statistics")
+async def stats(ctx):
+    if not member_cache.enabled:
+        await ctx.respond(embed=stats_tracker.cached_embed(ctx.guild, "stats", build_stats_embed))
+        return
+
+    # Most members aren't cached, so take the online count from Discord instead
+    embed = stats_tracker.cached(ctx.guild.id, "stats")
+    if embed is None:
+        counts = await bot.fetch_guild(ctx.guild.id, with_counts=True)
+        embed = stats_tracker.store(ctx.guild.id, "stats", build_stats_embed(ctx.guild, counts.approximate_presence_count))
     await ctx.respond(embed=embed)
 
 # User info command
@@ -853,6 +446,8 @@ async def stats(ctx):
 async def userinfo(ctx, member: discord.Member = None):
     if member is None:
         member = ctx.author
+    # Members that weren't cached come without their status and activities
+    member = await member_cache.get_member(ctx.guild, member.id) or member
     
     embed = discord.Embed(
         title=f"👤 User Information - {member}",
@@ -883,12 +478,7 @@ async def userinfo(ctx, member: discord.Member = None):
             embed.add_field(name="🎯 Activities", value="\n".join(activities), inline=False)
     
     # Get warning count
-    conn = sqlite3.connect('bot_data.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) FROM warnings WHERE user_id = ? AND guild_id = ?', 
-                  (member.id, ctx.guild.id))
-    warning_count = cursor.fetchone()[0]
-    conn.close()
+    warning_count = await writer.warning_count(member.id, ctx.guild.id)
     
     if warning_count > 0:
         embed.add_field(name="⚠️ Warnings", value=warning_count, inline=True)
@@ -919,10 +509,7 @@ async def avatar(ctx, member: discord.Member = None):
     await ctx.respond(embed=embed)
 
 # Server info command  
-@bot.slash_command(name="serverinfo", description="Get information about the server")
-async def serverinfo(ctx):
-    guild = ctx.guild
-    
+def build_serverinfo_embed(guild):
     embed = discord.Embed(
         title=f"🏰 {guild.name}",
         color=discord.Color.blue(),
@@ -933,6 +520,9 @@ async def serverinfo(ctx):
     embed.add_field(name="👑 Owner", value=guild.owner.mention if guild.owner else "Unknown", inline=True)
     embed.add_field(name="📅 Created", value=f"<t:{int(guild.created_at.timestamp())}:F>", inline=True)
     embed.add_field(name="👥 Members", value=guild.member_count, inline=True)
+    if not member_cache.enabled:
+        # Only known when every member is cached
+        embed.add_field(name="🤖 Bots", value=stats_tracker.get(guild).bots, inline=True)
     embed.add_field(name="🚀 Boost Level", value=guild.premium_tier, inline=True)
     embed.add_field(name="💎 Boosts", value=guild.premium_subscription_count, inline=True)
     embed.add_field(name="📁 Channels", value=len(guild.channels), inline=True)
@@ -949,7 +539,11 @@ async def serverinfo(ctx):
         embed.set_image(url=guild.banner.url)
     
     embed.set_footer(text=f"Verification Level: {guild.verification_level}")
-    await ctx.respond(embed=embed)
+    return embed
+
+@bot.slash_command(name="serverinfo", description="Get information about the server")
+async def serverinfo(ctx):
+    await ctx.respond(embed=stats_tracker.cached_embed(ctx.guild, "serverinfo", build_serverinfo_embed))
 
 # Run the bot
 if __name__ == "__main__":
@@ -0,0 +1,261 @@
+"""Run the bot as several processes, each owning a range of shards.
+
+    python cluster.py --processes 4 --shards 16
+
+starts four copies of bot.py with SHARD_IDS 0-3, 4-7, ... and restarts any
+that exit. The workers talk to each other over unix sockets in CLUSTER_DIR
+and elect one leader (whoever holds the lock file) to run the mute and
+giveaway schedulers. Without CLUSTER_ID set, bot.py runs standalone and is
+always the leader.
+"""
+import argparse
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = '/tmp/discord-bot-cluster'
+# How often followers try to take over the scheduler lock
+LEADER_RETRY = 10
+IPC_TIMEOUT = 5
+
+
+def _encode_key(key):
+    return list(key) if isinstance(key, tuple) else key
+
+
+def _decode_key(key):
+    return tuple(key) if isinstance(key, list) else key
+
+
+class Cluster:
+    """IPC server, peer queries and scheduler leadership for one worker"""
+
+    def __init__(self, cluster_id=None, directory=DEFAULT_DIR):
+        self.cluster_id = cluster_id
+        self.directory = directory
+        self.enabled = cluster_id is not None
+        self.handlers = {'schedule': self._handle_schedule, 'cancel': self._handle_cancel}
+        self.schedulers = {}
+        self._leader = asyncio.Event()
+        self._lock_file = None
+        self._server = None
+        self._tasks = set()
+        if not self.enabled:
+            self._leader.set()
+
+    @classmethod
+    def from_env(cls):
+        cluster_id = os.getenv('CLUSTER_ID')
+        return cls(int(cluster_id) if cluster_id else None, os.getenv('CLUSTER_DIR', DEFAULT_DIR))
+
+    @property
+    def is_leader(self):
+        return self._leader.is_set()
+
+    @property
+    def socket_path(self):
+        return os.path.join(self.directory, f'worker-{self.cluster_id}.sock')
+
+    def handler(self, op):
+        """Register ``func(payload)`` to answer ``op`` requests from other workers"""
+        def decorator(func):
+            self.handlers[op] = func
+            return func
+        return decorator
+
+    async def start(self):
+        if not self.enabled or self._server is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path)
+        self._spawn(self._elect())
+        logger.info(f"Cluster worker {self.cluster_id} listening on {self.socket_path}")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # Leadership
+
+    def _try_lock(self):
+        handle = open(os.path.join(self.directory, 'scheduler.lock'), 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        # Held until this process exits; the OS releases it if we crash
+        self._lock_file = handle
+        return True
+
+    async def _elect(self):
+        while not self._try_lock():
+            await asyncio.sleep(LEADER_RETRY)
+        logger.info(f"Cluster worker {self.cluster_id} is now running the schedulers")
+        self._leader.set()
+
+    async def wait_leader(self):
+        await self._leader.wait()
+
+    # Schedulers live on the leader; everyone else forwards to it
+
+    def register_scheduler(self, scheduler):
+        self.schedulers[scheduler.name] = scheduler
+
+    def schedule(self, scheduler, key, when):
+        if self.is_leader:
+            scheduler.schedule(key, when)
+        else:
+            self._spawn(self.broadcast('schedule', {
+                'scheduler': scheduler.name, 'key': _encode_key(key), 'when': when.isoformat()
+            }))
+
+    def cancel(self, scheduler, key):
+        if self.is_leader:
+            scheduler.cancel(key)
+        else:
+            self._spawn(self.broadcast('cancel', {'scheduler': scheduler.name, 'key': _encode_key(key)}))
+
+    async def _handle_schedule(self, payload):
+        scheduler = self.schedulers.get(payload['scheduler'])
+        if self.is_leader and scheduler is not None:
+            scheduler.schedule(_decode_key(payload['key']), datetime.fromisoformat(payload['when']))
+
+    async def _handle_cancel(self, payload):
+        scheduler = self.schedulers.get(payload['scheduler'])
+        if self.is_leader and scheduler is not None:
+            scheduler.cancel(_decode_key(payload['key']))
+
+    # IPC: one JSON line in, one JSON line out per connection
+
+    async def _serve(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline())
+            handler = self.handlers.get(request.get('op'))
+            result = await handler(request.get('payload')) if handler else None
+            writer.write(json.dumps({'result': result}).encode() + b'\n')
+            await writer.drain()
+        except Exception as e:
+            logger.warning(f"Cluster request failed: {e}")
+        finally:
+            writer.close()
+
+    async def _request(self, path, op, payload):
+        reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(path), IPC_TIMEOUT)
+        try:
+            writer.write(json.dumps({'op': op, 'payload': payload}).encode() + b'\n')
+            await writer.drain()
+            response = await asyncio.wait_for(reader.readline(), IPC_TIMEOUT)
+            return json.loads(response)['result']
+        finally:
+            writer.close()
+
+    def _peers(self):
+        return [path for path in glob.glob(os.path.join(self.directory, 'worker-*.sock'))
+                if path != self.socket_path]
+
+    async def broadcast(self, op, payload=None):
+        """Send ``op`` to every other worker and return the answers that came back"""
+        if not self.enabled:
+            return []
+        results = await asyncio.gather(*(self._request(path, op, payload) for path in self._peers()),
+                                       return_exceptions=True)
+        return [result for result in results if not isinstance(result, BaseException)]
+
+    async def gather(self, op, payload=None):
+        """Answers to ``op`` from this worker and every reachable peer"""
+        local = await self.handlers[op](payload)
+        return [local] + await self.broadcast(op, payload)
+
+
+def shard_ranges(shard_count, processes):
+    """Split ``shard_count`` shards into ``processes`` contiguous ranges"""
+    per_process, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = per_process + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return [shard_ids for shard_ids in ranges if shard_ids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the bot as several processes")
+    parser.add_argument('--processes', type=int, default=int(os.getenv('CLUSTER_PROCESSES', os.cpu_count() or 1)))
+    parser.add_argument('--shards', type=int, default=int(os.getenv('SHARD_COUNT', 0)) or None,
+                        help="total shard count (defaults to one per process)")
+    parser.add_argument('--dir', default=os.getenv('CLUSTER_DIR', DEFAULT_DIR))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - cluster - %(levelname)s - %(message)s')
+    shard_count = args.shards or args.processes
+    ranges = shard_ranges(shard_count, args.processes)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot.py')
+    os.makedirs(args.dir, exist_ok=True)
+
+    def spawn(cluster_id):
+        env = dict(os.environ, CLUSTER_ID=str(cluster_id), CLUSTER_DIR=args.dir,
+                   SHARD_COUNT=str(shard_count), SHARD_IDS=','.join(map(str, ranges[cluster_id])))
+        logger.info(f"Starting worker {cluster_id} with shards {ranges[cluster_id]}")
+        return subprocess.Popen([sys.executable, script], env=env)
+
+    workers = {cluster_id: spawn(cluster_id) for cluster_id in range(len(ranges))}
+    started = dict.fromkeys(workers, time.monotonic())
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for process in workers.values():
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Restart crashed workers, backing off if one keeps dying. A clean exit
+    # (/shutdown) is not restarted.
+    backoff = dict.fromkeys(workers, 1)
+    while not stopping and workers:
+        time.sleep(1)
+        for cluster_id, process in list(workers.items()):
+            if stopping or process.poll() is None:
+                continue
+            if process.returncode == 0:
+                logger.info(f"Worker {cluster_id} shut down")
+                del workers[cluster_id]
+                continue
+            if time.monotonic() - started[cluster_id] > 60:
+                backoff[cluster_id] = 1
+            logger.warning(f"Worker {cluster_id} exited with {process.returncode}, restarting in {backoff[cluster_id]}s")
+            time.sleep(backoff[cluster_id])
+            backoff[cluster_id] = min(backoff[cluster_id] * 2, 60)
+            workers[cluster_id] = spawn(cluster_id)
+            started[cluster_id] = time.monotonic()
+
+    for process in workers.values():
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import discord
+from discord.ext import commands
+import logging
+from storage import db
+from automod import AutoMod
+from wordfilter import FilterCache
+from modlog import action_embed
+from shared import cases, mod_log
+
+logger = logging.getLogger(__name__)
+
+class AutoModCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.automod = AutoMod()
+        self.filters = FilterCache(db)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if message.guild is None or message.author.bot:
+            return
+        # Staff are never auto-moderated
+        if isinstance(message.author, discord.Member) and message.author.guild_permissions.manage_messages:
+            return
+
+        word_filter = await self.filters.get(message.guild.id)
+        term = word_filter.check(message.content)
+        if term:
+            await self.filter_hit(message, term)
+            return
+
+        reason = self.automod.check_message(message)
+        if reason:
+            await self.punish(message.author, "mute", reason)
+
+    async def filter_hit(self, message, term):
+        """Delete a message containing a banned term and warn its author"""
+        try:
+            await message.delete()
+        except discord.HTTPException:
+            pass
+
+        moderation = self.bot.get_cog("ModerationCog")
+        if moderation is None or not isinstance(message.author, discord.Member):
+            return
+
+        reason = f"AutoMod: used a filtered term ({term})"
+        warning_count, escalation, _ = await moderation.add_warning(
+            message.guild, message.author, self.bot.user.id, reason
+        )
+        await moderation.notify_warning(message.guild, message.author, reason, warning_count, escalation)
+        await moderation.escalate_warnings(message.guild, message.author, warning_count, escalation)
+        logger.info(f"AutoMod warned {message.author} in {message.guild} for filtered term {term!r}")
+
+    @commands.slash_command(name="filteradd", description="Add a banned word or link to the filter")
+    @commands.has_permissions(manage_guild=True)
+    async def filter_add(self, ctx, term: str, kind: str = "word"):
+        kind = kind.lower()
+        if kind not in ("word", "link"):
+            await ctx.respond("❌ Kind must be `word` or `link`.", ephemeral=True)
+            return
+
+        await db.execute('INSERT OR IGNORE INTO filter_terms (guild_id, term, kind) VALUES (?, ?, ?)',
+                         (ctx.guild.id, term.strip(), kind))
+        self.filters.invalidate(ctx.guild.id)
+        await ctx.respond(f"✅ Added {kind} `{term.strip()}` to the filter.", ephemeral=True)
+
+    @commands.slash_command(name="filterremove", description="Remove a banned word or link from the filter")
+    @commands.has_permissions(manage_guild=True)
+    async def filter_remove(self, ctx, term: str):
+        removed = await db.execute('DELETE FROM filter_terms WHERE guild_id = ? AND term = ?',
+                                   (ctx.guild.id, term.strip()))
+        if not removed:
+            await ctx.respond("❌ That term isn't in the filter.", ephemeral=True)
+            return
+
+        self.filters.invalidate(ctx.guild.id)
+        await ctx.respond(f"✅ Removed `{term.strip()}` from the filter.", ephemeral=True)
+
+    @commands.slash_command(name="filterlist", description="Show the banned words and links")
+    @commands.has_permissions(manage_guild=True)
+    async def filter_list(self, ctx):
+        rows = await db.fetchall('SELECT term, kind FROM filter_terms WHERE guild_id = ? ORDER BY kind, term',
+                                 (ctx.guild.id,))
+        if not rows:
+            await ctx.respond("The filter is empty.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="🚫 Filtered Terms", color=discord.Color.red())
+        for kind in ("word", "link"):
+            terms = [f"`{term}`" for term, term_kind in rows if term_kind == kind]
+            if terms:
+                value = ", ".join(terms)
+                if len(value) > 1024:
+                    value = value[:1000].rsplit(",", 1)[0] + ", …"
+                embed.add_field(name=f"{kind.title()}s ({len(terms)})", value=value, inline=False)
+
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        if member.bot:
+            return
+
+        reason = self.automod.check_join(member)
+        if reason:
+            await self.punish(member, self.automod.config.RAID_ACTION, reason)
+
+    async def punish(self, member, action, reason):
+        moderation = self.bot.get_cog("ModerationCog")
+        if moderation is None:
+            return
+
+        reason = f"AutoMod: {reason}"
+        try:
+            if action == "ban":
+                await moderation.apply_ban(member.guild, member, reason)
+                duration = None
+            else:
+                duration = self.automod.config.MUTE_SECONDS
+                await moderation.apply_mute(member.guild, member, duration, reason)
+            case = await cases.record(member.guild.id, action, member.id, self.bot.user.id, reason, duration)
+            logger.info(f"AutoMod {action} {member} in {member.guild}: {reason}")
+            mod_log.log(member.guild, action_embed(
+                "🤖 AutoMod Ban" if action == "ban" else "🤖 AutoMod Mute", discord.Color.dark_red(),
+                target=member, moderator=self.bot.user, reason=reason, case=f"#{case}"
+            ))
+        except discord.HTTPException as e:
+            logger.warning(f"AutoMod could not {action} {member}: {e}")
+
+def setup(bot):
+    bot.add_cog(AutoModCog(bot))
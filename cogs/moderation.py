@@ -0,0 +1,878 @@
+import discord
+from discord.ext import commands
+import asyncio
+import re
+import time
+from datetime import datetime, timedelta
+import logging
+from storage import db, writer
+from scheduler import DeadlineScheduler
+from ratelimit import RateBudget, run_bounded
+from purge import PurgeFilter, PurgeJob
+from modlog import action_embed
+from guildconfig import SETTINGS
+from shared import PREFIX, cases, cluster, guild_config, member_cache, mod_log, parse_time
+
+logger = logging.getLogger(__name__)
+
+# Automatic action when a member reaches a warning count: (action, mute seconds)
+WARN_ESCALATION = {
+    3: ("mute", 3600),
+    5: ("kick", None),
+    7: ("ban", None),
+}
+WARNINGS_PAGE_SIZE = 10
+CASES_PAGE_SIZE = 10
+
+CASE_TITLES = {
+    "ban": "🔨 Ban",
+    "kick": "👢 Kick",
+    "mute": "🔇 Mute",
+    "unmute": "🔊 Unmute",
+    "warn": "⚠️ Warning",
+}
+
+def escalation_for(previous, current):
+    """The strictest WARN_ESCALATION rule crossed going from ``previous`` to ``current`` warnings"""
+    crossed = [count for count in WARN_ESCALATION if previous < count <= current]
+    return WARN_ESCALATION[max(crossed)] if crossed else None
+
+def describe_cases(numbers):
+    """Case numbers for a summary; other cases can take numbers in between"""
+    if len(numbers) <= 10:
+        return ", ".join(f"#{number}" for number in numbers)
+    first, last = min(numbers), max(numbers)
+    if last - first + 1 == len(numbers):
+        return f"#{first}-#{last}"
+    return f"{len(numbers)} cases between #{first} and #{last} (not contiguous)"
+
+def describe_escalation(escalation):
+    action, duration = escalation
+    if action == "mute":
+        return f"Muted for {timedelta(seconds=duration)}"
+    return "Kicked" if action == "kick" else "Banned"
+
+class ModerationCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Fires expire_mute((user_id, guild_id)) exactly when a mute runs out
+        self.mute_scheduler = DeadlineScheduler(self.expire_mute, name="mutes")
+        cluster.register_scheduler(self.mute_scheduler)
+        self.bot.loop.create_task(self.load_mutes())
+        # Shared by bulk jobs so they stay well under the global rate limit
+        self.budget = RateBudget(rate=40)
+        # guild_id -> running Muted role setup
+        self.provisioning = {}
+        # guild_id -> lock held while the Muted role is being created
+        self.muted_role_locks = {}
+        # guild_id -> Muted role we created, until the gateway adds it to the role cache
+        self.created_muted_roles = {}
+    
+    def cog_unload(self):
+        self.mute_scheduler.stop()
+    
+    async def load_mutes(self):
+        """Load pending unmutes from the database and start the scheduler"""
+        await self.bot.wait_until_ready()
+        # In cluster mode only one process expires mutes
+        await cluster.wait_leader()
+        await writer.flush()
+        rows = await db.fetchall('SELECT user_id, guild_id, unmute_time FROM muted_users ORDER BY unmute_time')
+        
+        for user_id, guild_id, unmute_time in rows:
+            try:
+                when = datetime.fromisoformat(str(unmute_time))
+            except ValueError:
+                # Unreadable timestamp, let it expire straight away
+                when = datetime.utcnow()
+            self.mute_scheduler.schedule((user_id, guild_id), when)
+        
+        self.mute_scheduler.start()
+        logger.info(f"Scheduled {len(rows)} pending unmutes")
+    
+    async def expire_mute(self, key):
+        """Remove an expired mute"""
+        user_id, guild_id = key
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member:
+            muted_role = await self.get_muted_role(guild)
+            if muted_role and muted_role in member.roles:
+                await member.remove_roles(muted_role)
+        elif (guild and member_cache.enabled) or (not guild and cluster.enabled):
+            # Not in the member cache, or the guild lives on another cluster
+            # process: remove the role over REST instead of fetching the member
+            role_id = await guild_config.get(guild_id, "muted_role")
+            if role_id:
+                try:
+                    await self.bot.http.remove_role(guild_id, user_id, role_id, reason="Mute expired")
+                except discord.NotFound:
+                    pass
+        
+        # Re-muted while we were removing the role, keep the new record
+        if key not in self.mute_scheduler:
+            writer.clear_mute(user_id, guild_id)
+    
+    @commands.slash_command(name="ban", description="Ban a user from the server")
+    @commands.has_permissions(ban_members=True)
+    async def ban(self, ctx, member: discord.Member, *, reason: str = "No reason provided"):
+        try:
+            await member.ban(reason=f"{ctx.author}: {reason}")
+            case = await cases.record(ctx.guild.id, "ban", member.id, ctx.author.id, reason)
+            
+            embed = discord.Embed(
+                title="🔨 User Banned",
+                color=discord.Color.red(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            embed.add_field(name="Reason", value=reason, inline=True)
+            embed.set_footer(text=f"Case #{case} • ID: {member.id}")
+            
+            await ctx.respond(embed=embed)
+            mod_log.log(ctx.guild, embed)
+            logger.info(f"{ctx.author} banned {member} for: {reason}")
+            
+        except discord.Forbidden:
+            await ctx.respond("❌ I don't have permission to ban this user.", ephemeral=True)
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+    
+    @commands.slash_command(name="kick", description="Kick a user from the server")
+    @commands.has_permissions(kick_members=True)
+    async def kick(self, ctx, member: discord.Member, *, reason: str = "No reason provided"):
+        try:
+            await member.kick(reason=f"{ctx.author}: {reason}")
+            case = await cases.record(ctx.guild.id, "kick", member.id, ctx.author.id, reason)
+            
+            embed = discord.Embed(
+                title="👢 User Kicked",
+                color=discord.Color.orange(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            embed.add_field(name="Reason", value=reason, inline=True)
+            embed.set_footer(text=f"Case #{case} • ID: {member.id}")
+            
+            await ctx.respond(embed=embed)
+            mod_log.log(ctx.guild, embed)
+            logger.info(f"{ctx.author} kicked {member} for: {reason}")
+            
+        except discord.Forbidden:
+            await ctx.respond("❌ I don't have permission to kick this user.", ephemeral=True)
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @commands.slash_command(name="massban", description="Ban many users at once by IDs, join time or name pattern")
+    @commands.has_permissions(ban_members=True)
+    async def massban(self, ctx, ids: str = None, joined_within: str = None, name_pattern: str = None,
+                      reason: str = "No reason provided", confirm: bool = False):
+        await self.mass_action(ctx, "ban", ids, joined_within, name_pattern, reason, confirm)
+
+    @commands.slash_command(name="masskick", description="Kick many members at once by IDs, join time or name pattern")
+    @commands.has_permissions(kick_members=True)
+    async def masskick(self, ctx, ids: str = None, joined_within: str = None, name_pattern: str = None,
+                       reason: str = "No reason provided", confirm: bool = False):
+        await self.mass_action(ctx, "kick", ids, joined_within, name_pattern, reason, confirm)
+
+    def can_moderate(self, ctx, target):
+        """Whether the invoking moderator (and the bot) outrank the target"""
+        if target.id in (ctx.author.id, self.bot.user.id, ctx.guild.owner_id):
+            return False
+        if not isinstance(target, discord.Member):
+            # Not in the guild (resolve_mass_targets looked them up), no roles to compare
+            return True
+        if ctx.author.id != ctx.guild.owner_id and target.top_role >= ctx.author.top_role:
+            return False
+        return target.top_role < ctx.guild.me.top_role
+
+    async def resolve_mass_targets(self, ctx, action, user_ids, joined_within, name_pattern):
+        """Members (or bare IDs for bans) matching every given criterion"""
+        guild = ctx.guild
+        if user_ids is not None:
+            # Members outside the cache are fetched so the hierarchy check sees their roles;
+            # only IDs that aren't in the guild at all become bare users
+            members = await member_cache.fetch_members(guild, user_ids)
+            candidates = [members.get(user_id) or discord.Object(id=user_id) for user_id in user_ids]
+        else:
+            candidates = list(guild.members)
+
+        if joined_within:
+            cutoff = discord.utils.utcnow() - timedelta(seconds=parse_time(joined_within))
+            candidates = [member for member in candidates
+                          if isinstance(member, discord.Member) and member.joined_at and member.joined_at >= cutoff]
+
+        if name_pattern:
+            regex = re.compile(name_pattern, re.IGNORECASE)
+            candidates = [member for member in candidates
+                          if isinstance(member, discord.Member)
+                          and (regex.search(member.name) or regex.search(member.display_name))]
+
+        if action == "kick":
+            # Only members can be kicked
+            candidates = [member for member in candidates if isinstance(member, discord.Member)]
+
+        return [target for target in candidates if self.can_moderate(ctx, target)]
+
+    async def mass_action(self, ctx, action, ids, joined_within, name_pattern, reason, confirm):
+        if not (ids or joined_within or name_pattern):
+            await ctx.respond("❌ Give at least one of `ids`, `joined_within` or `name_pattern`.", ephemeral=True)
+            return
+        if joined_within and not parse_time(joined_within):
+            await ctx.respond("❌ Invalid duration format. Use s/m/h/d (e.g., 10m, 1h)", ephemeral=True)
+            return
+
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in re.findall(r"\d{15,20}", ids))) if ids else None
+        needs_chunk = (joined_within or name_pattern) and member_cache.enabled and not ctx.guild.chunked
+        if needs_chunk or any(ctx.guild.get_member(user_id) is None for user_id in user_ids or ()):
+            # Filters walk the whole member list and uncached IDs are looked up;
+            # either can take longer than the reply window
+            await ctx.defer(ephemeral=not confirm)
+            if needs_chunk:
+                await member_cache.chunk(ctx.guild)
+
+        try:
+            targets = await self.resolve_mass_targets(ctx, action, user_ids, joined_within, name_pattern)
+        except re.error:
+            await ctx.respond("❌ Invalid regex pattern.", ephemeral=True)
+            return
+        except asyncio.TimeoutError:
+            await ctx.respond("❌ Discord didn't return the members in time, please try again.", ephemeral=True)
+            return
+
+        if not targets:
+            await ctx.respond("❌ No users matched (or none that you are allowed to moderate).", ephemeral=True)
+            return
+
+        if not confirm:
+            sample = ", ".join(f"<@{target.id}>" for target in targets[:20])
+            if len(targets) > 20:
+                sample += f" and {len(targets) - 20} more"
+            embed = discord.Embed(
+                title=f"🔍 Mass {action} preview",
+                description=f"**{len(targets)}** users match.\nRun the command again with `confirm: True` to {action} them.",
+                color=discord.Color.orange()
+            )
+            embed.add_field(name="Targets", value=sample, inline=False)
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+
+        if not ctx.response.is_done():
+            await ctx.defer()
+        started = time.monotonic()
+        audit_reason = f"{ctx.author}: {reason} (mass {action})"
+        done_ids = []
+
+        if action == "ban":
+            # One request bans up to 200 users
+            items = [targets[i:i + 200] for i in range(0, len(targets), 200)]
+
+            async def apply(chunk):
+                banned, _ = await ctx.guild.bulk_ban(*chunk, reason=audit_reason)
+                done_ids.extend(user.id for user in banned)
+        else:
+            items = targets
+
+            async def apply(member):
+                await member.kick(reason=audit_reason)
+                done_ids.append(member.id)
+
+        job = asyncio.ensure_future(run_bounded(
+            items, apply, concurrency=2 if action == "ban" else 5, budget=self.budget
+        ))
+
+        status = None
+        try:
+            status = await ctx.followup.send(f"⚙️ Mass {action} of {len(targets)} users in progress...")
+            while not job.done():
+                await asyncio.wait({job}, timeout=3)
+                if not job.done():
+                    await status.edit(content=f"⚙️ Mass {action}: {len(done_ids)}/{len(targets)} users")
+        except discord.HTTPException:
+            pass
+
+        await job
+
+        elapsed = time.monotonic() - started
+        failed = len(targets) - len(done_ids)
+
+        # Still one case per user, so /history shows it for each of them
+        case_numbers = [
+            await cases.record(ctx.guild.id, action, user_id, ctx.author.id, f"{reason} (mass {action})")
+            for user_id in done_ids
+        ]
+
+        # One record for the whole batch instead of one line per user
+        logger.info(
+            f"{ctx.author} mass {action}ed {len(done_ids)}/{len(targets)} users in {ctx.guild} "
+            f"for: {reason} | ids: {' '.join(str(user_id) for user_id in done_ids)}"
+        )
+
+        embed = discord.Embed(
+            title="🔨 Mass Ban Complete" if action == "ban" else "👢 Mass Kick Complete",
+            color=discord.Color.red() if action == "ban" else discord.Color.orange(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="Matched", value=len(targets), inline=True)
+        embed.add_field(name="Succeeded", value=len(done_ids), inline=True)
+        embed.add_field(name="Failed", value=failed, inline=True)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        embed.add_field(name="Time", value=f"{elapsed:.1f}s", inline=True)
+        if case_numbers:
+            embed.add_field(name="Cases", value=describe_cases(case_numbers), inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+
+        if status:
+            try:
+                await status.delete()
+            except discord.HTTPException:
+                pass
+        await ctx.followup.send(embed=embed)
+        mod_log.log(ctx.guild, embed)
+
+    @commands.slash_command(name="mute", description="Mute a user for a specific duration")
+    @commands.has_permissions(manage_roles=True)
+    async def mute(self, ctx, member: discord.Member, duration: str, *, reason: str = "No reason provided"):
+        try:
+            # Parse duration (e.g., "1h", "30m", "1d")
+            time_units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+            duration_seconds = 0
+            
+            if duration[-1] in time_units:
+                duration_seconds = int(duration[:-1]) * time_units[duration[-1]]
+            else:
+                await ctx.respond("❌ Invalid duration format. Use s/m/h/d (e.g., 1h, 30m)", ephemeral=True)
+                return
+            
+            # Get or create muted role
+            muted_role = await self.get_muted_role(ctx.guild)
+            new_role = muted_role is None
+            if new_role:
+                # Channel overwrites are applied in the background, so ack first
+                await ctx.defer()
+                muted_role, new_role = await self.create_muted_role(ctx.guild)
+
+            await self.apply_mute(ctx.guild, member, duration_seconds, f"{ctx.author}: {reason}", muted_role)
+            case = await cases.record(ctx.guild.id, "mute", member.id, ctx.author.id, reason, duration_seconds)
+            
+            embed = discord.Embed(
+                title="🔇 User Muted",
+                color=discord.Color.dark_grey(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
+            embed.add_field(name="Duration", value=duration, inline=True)
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            embed.add_field(name="Reason", value=reason, inline=False)
+            embed.set_footer(text=f"Case #{case} • ID: {member.id}")
+
+            await ctx.respond(embed=embed)
+            mod_log.log(ctx.guild, embed)
+
+            if new_role:
+                self.start_provisioning(ctx.guild, muted_role, ctx)
+
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    async def get_muted_role(self, guild):
+        role_id = await guild_config.get(guild.id, "muted_role")
+        if role_id is not None:
+            created = self.created_muted_roles.get(guild.id)
+            return guild.get_role(role_id) or (created if created and created.id == role_id else None)
+
+        # Not configured yet: adopt an existing "Muted" role once, by ID from then on
+        role = discord.utils.get(guild.roles, name="Muted")
+        if role is not None:
+            await guild_config.set(guild.id, "muted_role", role.id)
+        return role
+
+    async def create_muted_role(self, guild):
+        """Create the Muted role unless a concurrent caller already did.
+
+        Returns ``(role, created)``; only the caller that created the role
+        should start its channel setup.
+        """
+        lock = self.muted_role_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            # Whoever held the lock before us may have created it meanwhile
+            role = await self.get_muted_role(guild)
+            if role is not None:
+                return role, False
+            role = await guild.create_role(name="Muted", color=discord.Color.dark_grey())
+            self.created_muted_roles[guild.id] = role
+            await guild_config.set(guild.id, "muted_role", role.id)
+            return role, True
+
+    async def apply_mute(self, guild, member, duration_seconds, reason, muted_role=None):
+        """Mute a member and schedule the unmute.
+
+        Shared by /mute and automod. When the Muted role doesn't exist yet it
+        is created and its channel setup started in the background.
+        """
+        if muted_role is None:
+            muted_role = await self.get_muted_role(guild)
+        if muted_role is None:
+            muted_role, created = await self.create_muted_role(guild)
+            if created:
+                self.start_provisioning(guild, muted_role)
+
+        await member.add_roles(muted_role, reason=reason)
+
+        # Store mute in database
+        unmute_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
+        writer.set_mute(member.id, guild.id, unmute_time)
+        cluster.schedule(self.mute_scheduler, (member.id, guild.id), unmute_time)
+        return unmute_time
+
+    async def apply_ban(self, guild, member, reason):
+        await guild.ban(member, reason=reason)
+        logger.info(f"Banned {member} from {guild}: {reason}")
+
+    def start_provisioning(self, guild, role, ctx=None):
+        if guild.id in self.provisioning:
+            return
+        task = self.bot.loop.create_task(self.provision_muted_role(guild, role, ctx))
+        self.provisioning[guild.id] = task
+        task.add_done_callback(lambda _: self.provisioning.pop(guild.id, None))
+
+    async def provision_muted_role(self, guild, role, ctx=None):
+        """Deny sending and speaking for the Muted role across the guild.
+
+        Discord doesn't copy a category overwrite to the channels synced with
+        it, so every channel is edited, categories first. A synced channel
+        gets the same overwrite as its category and stays synced. Edits run a
+        few at a time; with a ``ctx`` the progress is reported in an ephemeral
+        followup.
+        """
+        targets = sorted(guild.channels, key=lambda channel: not isinstance(channel, discord.CategoryChannel))
+
+        async def apply(channel):
+            await channel.set_permissions(role, send_messages=False, speak=False,
+                                          reason="Setting up Muted role")
+
+        progress = {"done": 0}
+        job = asyncio.ensure_future(run_bounded(
+            targets, apply, concurrency=5, budget=self.budget,
+            on_progress=lambda done, total: progress.update(done=done)
+        ))
+
+        status = None
+        if ctx is not None:
+            try:
+                status = await ctx.followup.send(
+                    f"⚙️ Setting up {role.mention} in {len(targets)} channels...", ephemeral=True
+                )
+                while not job.done():
+                    await asyncio.wait({job}, timeout=3)
+                    if not job.done():
+                        await status.edit(content=f"⚙️ Setting up {role.mention}: {progress['done']}/{len(targets)} channels")
+            except discord.HTTPException:
+                # The interaction token can expire on very large guilds, the job carries on
+                pass
+
+        succeeded, failed = await job
+        logger.info(f"Muted role set up in {guild}: {len(succeeded)} channels, {len(failed)} failed")
+
+        if status:
+            content = f"✅ {role.mention} set up in {len(succeeded)} channels"
+            if failed:
+                content += f" ({len(failed)} failed, check my permissions there)"
+            try:
+                await status.edit(content=content)
+            except discord.HTTPException:
+                pass
+
+    @commands.slash_command(name="unmute", description="Remove mute from a user")
+    @commands.has_permissions(manage_roles=True)
+    async def unmute(self, ctx, member: discord.Member):
+        try:
+            muted_role = await self.get_muted_role(ctx.guild)
+            if muted_role and muted_role in member.roles:
+                await member.remove_roles(muted_role)
+                
+                # Remove from database
+                writer.clear_mute(member.id, ctx.guild.id)
+                cluster.cancel(self.mute_scheduler, (member.id, ctx.guild.id))
+                case = await cases.record(ctx.guild.id, "unmute", member.id, ctx.author.id)
+                
+                embed = discord.Embed(
+                    title="🔊 User Unmuted",
+                    color=discord.Color.green(),
+                    timestamp=datetime.utcnow()
+                )
+                embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
+                embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+                embed.set_footer(text=f"Case #{case} • ID: {member.id}")
+                
+                await ctx.respond(embed=embed)
+                mod_log.log(ctx.guild, embed)
+            else:
+                await ctx.respond("❌ This user is not muted.", ephemeral=True)
+                
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+    
+    @commands.slash_command(name="warn", description="Warn a user and log the warning")
+    @commands.has_permissions(manage_messages=True)
+    async def warn(self, ctx, member: discord.Member, *, reason: str):
+        warning_count, escalation, case = await self.add_warning(ctx.guild, member, ctx.author.id, reason)
+
+        embed = discord.Embed(
+            title="⚠️ User Warned",
+            color=discord.Color.yellow(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="User", value=f"{member.mention} ({member})", inline=False)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        embed.add_field(name="Warning Count", value=f"{warning_count}", inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if escalation:
+            embed.add_field(name="Escalation", value=describe_escalation(escalation), inline=False)
+        embed.set_footer(text=f"Case #{case} • ID: {member.id}")
+        
+        await ctx.respond(embed=embed)
+        mod_log.log(ctx.guild, embed)
+        await self.notify_warning(ctx.guild, member, reason, warning_count, escalation)
+        await self.escalate_warnings(ctx.guild, member, warning_count, escalation)
+
+    async def add_warning(self, guild, member, moderator_id, reason):
+        """Record a warning.
+
+        Returns the member's warning count, the escalation it triggers (or
+        None) and the warning's case number.
+        """
+        previous, warning_count = await writer.add_warning(member.id, guild.id, moderator_id, reason)
+        case = await cases.record(guild.id, "warn", member.id, moderator_id, reason)
+        return warning_count, escalation_for(previous, warning_count), case
+
+    async def notify_warning(self, guild, member, reason, warning_count, escalation=None):
+        # Try to DM the user
+        try:
+            dm_embed = discord.Embed(
+                title="⚠️ You have been warned",
+                description=f"You have been warned in **{guild.name}**",
+                color=discord.Color.yellow()
+            )
+            dm_embed.add_field(name="Reason", value=reason, inline=False)
+            dm_embed.add_field(name="Total Warnings", value=f"{warning_count}", inline=True)
+            if escalation:
+                dm_embed.add_field(name="Consequence", value=describe_escalation(escalation), inline=True)
+            await member.send(embed=dm_embed)
+        except:
+            pass
+
+    async def escalate_warnings(self, guild, member, warning_count, escalation):
+        """Apply the escalation returned by :meth:`add_warning`, if any"""
+        if escalation is None:
+            return
+
+        action, duration = escalation
+        reason = f"Reached {warning_count} warnings"
+        try:
+            if action == "mute":
+                await self.apply_mute(guild, member, duration, reason)
+            elif action == "kick":
+                await member.kick(reason=reason)
+            elif action == "ban":
+                await self.apply_ban(guild, member, reason)
+            case = await cases.record(guild.id, action, member.id, self.bot.user.id, reason, duration)
+            logger.info(f"Escalated {member} in {guild} to {action}: {reason}")
+            mod_log.log(guild, action_embed(
+                "📈 Warning Escalation", discord.Color.dark_red(), target=member,
+                moderator=self.bot.user, reason=reason, action=describe_escalation(escalation), case=f"#{case}"
+            ))
+        except discord.HTTPException as e:
+            logger.warning(f"Could not escalate {member} to {action}: {e}")
+
+    @commands.slash_command(name="warnings", description="List a user's warnings")
+    @commands.has_permissions(manage_messages=True)
+    async def warnings(self, ctx, member: discord.User, before: int = None):
+        # Make sure warnings still sitting in the write queue show up
+        await writer.flush()
+
+        # Keyset pagination: each page continues below the last ID shown,
+        # which the (guild_id, user_id, id) index serves without an OFFSET scan
+        rows = await db.fetchall('''
+            SELECT id, moderator_id, reason, timestamp FROM warnings
+            WHERE guild_id = ? AND user_id = ? AND id < ?
+            ORDER BY id DESC LIMIT ?
+        ''', (ctx.guild.id, member.id, before or 2 ** 63 - 1, WARNINGS_PAGE_SIZE + 1))
+        total = await writer.warning_count(member.id, ctx.guild.id)
+
+        if not rows:
+            await ctx.respond(f"✅ {member.mention} has no {'more ' if before else ''}warnings.", ephemeral=True)
+            return
+
+        has_more = len(rows) > WARNINGS_PAGE_SIZE
+        rows = rows[:WARNINGS_PAGE_SIZE]
+
+        embed = discord.Embed(
+            title=f"⚠️ Warnings for {member}",
+            description=f"**{total}** warnings in total",
+            color=discord.Color.yellow()
+        )
+        for warning_id, moderator_id, reason, timestamp in rows:
+            embed.add_field(
+                name=f"#{warning_id} • {timestamp} UTC",
+                value=f"{reason}\nby <@{moderator_id}>"[:1024],
+                inline=False
+            )
+
+        if has_more:
+            embed.set_footer(text=f"Use before: {rows[-1][0]} to see older warnings")
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @commands.slash_command(name="delwarn", description="Delete a single warning by its ID")
+    @commands.has_permissions(manage_messages=True)
+    async def delwarn(self, ctx, warning_id: int):
+        await writer.flush()
+        row = await db.fetchone('SELECT user_id FROM warnings WHERE id = ? AND guild_id = ?',
+                                (warning_id, ctx.guild.id))
+        if row is None:
+            await ctx.respond(f"❌ No warning #{warning_id} in this server.", ephemeral=True)
+            return
+
+        await db.execute('DELETE FROM warnings WHERE id = ? AND guild_id = ?', (warning_id, ctx.guild.id))
+        logger.info(f"{ctx.author} deleted warning #{warning_id} of user {row[0]} in {ctx.guild}")
+        await ctx.respond(f"🗑️ Deleted warning #{warning_id} from <@{row[0]}>.", ephemeral=True)
+        mod_log.log(ctx.guild, action_embed(
+            "🗑️ Warning Deleted", discord.Color.light_grey(), moderator=ctx.author,
+            warning=f"#{warning_id}", user=f"<@{row[0]}>"
+        ))
+
+    @commands.slash_command(name="clearwarns", description="Delete all of a user's warnings")
+    @commands.has_permissions(administrator=True)
+    async def clearwarns(self, ctx, member: discord.User):
+        await writer.flush()
+        removed = await db.execute('DELETE FROM warnings WHERE guild_id = ? AND user_id = ?',
+                                   (ctx.guild.id, member.id))
+        logger.info(f"{ctx.author} cleared {removed} warnings of {member} in {ctx.guild}")
+        await ctx.respond(f"🧹 Cleared {removed} warnings from {member.mention}.", ephemeral=True)
+        mod_log.log(ctx.guild, action_embed(
+            "🧹 Warnings Cleared", discord.Color.light_grey(), target=member,
+            moderator=ctx.author, removed=removed
+        ))
+
+    @staticmethod
+    def describe_case(user_id, moderator_id, reason, duration):
+        parts = [f"<@{user_id}> by <@{moderator_id}>"]
+        if duration:
+            parts.append(f"for {timedelta(seconds=duration)}")
+        if reason:
+            parts.append(f"\n{reason}")
+        return " ".join(parts)
+
+    @commands.slash_command(name="case", description="Show a single moderation case by its number")
+    @commands.has_permissions(manage_messages=True)
+    async def case(self, ctx, number: int):
+        row = await cases.get(ctx.guild.id, number)
+        if row is None:
+            await ctx.respond(f"❌ No case #{number} in this server.", ephemeral=True)
+            return
+
+        case_number, action, user_id, moderator_id, reason, duration, created_at = row
+        embed = discord.Embed(
+            title=f"Case #{case_number} • {CASE_TITLES.get(action, action.title())}",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="User", value=f"<@{user_id}>", inline=True)
+        embed.add_field(name="Moderator", value=f"<@{moderator_id}>", inline=True)
+        if duration:
+            embed.add_field(name="Duration", value=str(timedelta(seconds=duration)), inline=True)
+        embed.add_field(name="Reason", value=(reason or "No reason provided")[:1024], inline=False)
+        embed.set_footer(text=f"{created_at} UTC • User ID: {user_id}")
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @commands.slash_command(name="history", description="List moderation cases, optionally for one user or matching a reason")
+    @commands.has_permissions(manage_messages=True)
+    async def history(self, ctx, member: discord.User = None, search: str = None, before: int = None):
+        # Same keyset pagination as /warnings, continuing below the last case number shown
+        rows = await cases.history(ctx.guild.id, member.id if member else None, search, before, CASES_PAGE_SIZE + 1)
+
+        if not rows:
+            await ctx.respond(f"✅ No {'more ' if before else ''}matching cases.", ephemeral=True)
+            return
+
+        has_more = len(rows) > CASES_PAGE_SIZE
+        rows = rows[:CASES_PAGE_SIZE]
+
+        title = f"📁 Cases for {member}" if member else "📁 Moderation Cases"
+        embed = discord.Embed(
+            title=title,
+            description=f"Reasons matching **{search}**" if search else None,
+            color=discord.Color.blurple()
+        )
+        for case_number, action, user_id, moderator_id, reason, duration, created_at in rows:
+            embed.add_field(
+                name=f"#{case_number} • {CASE_TITLES.get(action, action.title())} • {created_at} UTC",
+                value=self.describe_case(user_id, moderator_id, reason, duration)[:1024],
+                inline=False
+            )
+
+        if has_more:
+            embed.set_footer(text=f"Use before: {rows[-1][0]} to see older cases")
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @commands.slash_command(name="modlog", description="Set or clear the channel moderation actions are logged to")
+    @commands.has_permissions(administrator=True)
+    async def modlog(self, ctx, channel: discord.TextChannel = None):
+        await guild_config.set(ctx.guild.id, "modlog_channel", channel.id if channel else None)
+        if channel:
+            await ctx.respond(f"📋 Moderation actions will be logged to {channel.mention}.", ephemeral=True)
+        else:
+            await ctx.respond("📋 Moderation logging disabled.", ephemeral=True)
+
+    @commands.slash_command(name="config", description="Show or change this server's bot settings")
+    @commands.has_permissions(administrator=True)
+    async def config(self, ctx, muted_role: discord.Role = None, welcome_channel: discord.TextChannel = None,
+                     modlog_channel: discord.TextChannel = None, prefix: str = None,
+                     reset: discord.Option(str, choices=list(SETTINGS), required=False) = None):
+        changes = {
+            "muted_role": muted_role.id if muted_role else None,
+            "welcome_channel": welcome_channel.id if welcome_channel else None,
+            "modlog_channel": modlog_channel.id if modlog_channel else None,
+            "prefix": prefix,
+        }
+        for key, value in changes.items():
+            if value is not None:
+                await guild_config.set(ctx.guild.id, key, value)
+        if reset:
+            await guild_config.set(ctx.guild.id, reset, None)
+
+        settings = await guild_config.load(ctx.guild.id)
+        embed = discord.Embed(title=f"⚙️ {ctx.guild.name} Settings", color=discord.Color.blurple())
+        embed.add_field(name="Muted Role", value=f"<@&{settings['muted_role']}>" if "muted_role" in settings else "Not set", inline=True)
+        embed.add_field(name="Welcome Channel", value=f"<#{settings['welcome_channel']}>" if "welcome_channel" in settings else "Not set", inline=True)
+        embed.add_field(name="Mod-log Channel", value=f"<#{settings['modlog_channel']}>" if "modlog_channel" in settings else "Not set", inline=True)
+        embed.add_field(name="Prefix", value=f"`{settings.get('prefix', PREFIX)}`", inline=True)
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @commands.slash_command(name="clear", description="Delete a number of messages from the channel")
+    @commands.has_permissions(manage_messages=True)
+    async def clear(self, ctx, amount: int):
+        if amount < 1 or amount > 100:
+            await ctx.respond("❌ Amount must be between 1 and 100.", ephemeral=True)
+            return
+        
+        try:
+            deleted = await ctx.channel.purge(limit=amount)
+            
+            embed = discord.Embed(
+                title="🧹 Messages Cleared",
+                description=f"Deleted {len(deleted)} messages",
+                color=discord.Color.green(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            embed.add_field(name="Channel", value=ctx.channel.mention, inline=True)
+            
+            await ctx.respond(embed=embed, delete_after=5)
+            mod_log.log(ctx.guild, embed)
+
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+    @commands.slash_command(name="purge", description="Delete matching messages across one or more channels")
+    @commands.has_permissions(manage_messages=True)
+    async def purge(self, ctx, amount: int, user: discord.User = None, pattern: str = None,
+                    max_age: str = None, attachments: bool = None, channels: str = None):
+        if amount < 1 or amount > 10000:
+            await ctx.respond("❌ Amount must be between 1 and 10000.", ephemeral=True)
+            return
+
+        age = None
+        if max_age:
+            age_seconds = parse_time(max_age)
+            if not age_seconds:
+                await ctx.respond("❌ Invalid max age. Use s/m/h/d (e.g., 30m, 2d)", ephemeral=True)
+                return
+            age = timedelta(seconds=age_seconds)
+
+        try:
+            message_filter = PurgeFilter(user.id if user else None, pattern, age, attachments)
+        except re.error:
+            await ctx.respond("❌ Invalid regex pattern.", ephemeral=True)
+            return
+
+        # "all", channel mentions/IDs, or just the current channel
+        if channels and channels.strip().lower() == "all":
+            targets = ctx.guild.text_channels
+        elif channels:
+            targets = [ctx.guild.get_channel(int(channel_id)) for channel_id in re.findall(r"\d{15,20}", channels)]
+        else:
+            targets = [ctx.channel]
+
+        me = ctx.guild.me
+        targets = [
+            channel for channel in targets
+            if isinstance(channel, discord.TextChannel)
+            and channel.permissions_for(me).manage_messages
+            and channel.permissions_for(me).read_message_history
+        ]
+        if not targets:
+            await ctx.respond("❌ No channels I can purge.", ephemeral=True)
+            return
+
+        await ctx.defer(ephemeral=True)
+        job = await PurgeJob(message_filter, amount, self.budget).run(targets)
+        logger.info(f"{ctx.author} purged {job.deleted} messages across {len(targets)} channels")
+
+        embed = discord.Embed(
+            title="🧹 Purge Complete",
+            description=f"Deleted {job.deleted} messages in {len(targets)} channels",
+            color=discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="Scanned", value=job.scanned, inline=True)
+        embed.add_field(name="Failed", value=job.failed, inline=True)
+        embed.add_field(name="Throughput", value=f"{job.throughput:.1f} msg/s over {job.elapsed:.1f}s", inline=True)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+
+        await ctx.respond(embed=embed, ephemeral=True)
+        mod_log.log(ctx.guild, embed)
+    
+    @commands.slash_command(name="lock", description="Lock the channel (remove send permissions)")
+    @commands.has_permissions(manage_channels=True)
+    async def lock(self, ctx):
+        try:
+            await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=False)
+            
+            embed = discord.Embed(
+                title="🔒 Channel Locked",
+                description=f"{ctx.channel.mention} has been locked",
+                color=discord.Color.red(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            
+            await ctx.respond(embed=embed)
+            mod_log.log(ctx.guild, embed)
+            
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+    
+    @commands.slash_command(name="unlock", description="Unlock the channel (restore send permissions)")
+    @commands.has_permissions(manage_channels=True)
+    async def unlock(self, ctx):
+        try:
+            await ctx.channel.set_permissions(ctx.guild.default_role, send_messages=None)
+            
+            embed = discord.Embed(
+                title="🔓 Channel Unlocked",
+                description=f"{ctx.channel.mention} has been unlocked",
+                color=discord.Color.green(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+            
+            await ctx.respond(embed=embed)
+            mod_log.log(ctx.guild, embed)
+            
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+
+def setup(bot):
+    bot.add_cog(ModerationCog(bot))
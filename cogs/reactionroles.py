@@ -0,0 +1,95 @@
+import discord
+from discord.ext import commands
+import asyncio
+import logging
+from storage import db
+
+logger = logging.getLogger(__name__)
+
+class ReactionRolesCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # (message_id, emoji) -> role_id for every configured reaction role
+        self.index = {}
+        self.index_loaded = asyncio.Event()
+        self.bot.loop.create_task(self.load_index())
+    
+    async def load_index(self):
+        rows = await db.fetchall('SELECT message_id, emoji, role_id FROM reaction_roles')
+        self.index = {(message_id, emoji): role_id for message_id, emoji, role_id in rows}
+        self.index_loaded.set()
+        logger.info(f"Loaded {len(self.index)} reaction roles")
+    
+    @commands.slash_command(name="reactionrole", description="Set up reaction roles")
+    @commands.has_permissions(manage_roles=True)
+    async def setup_reaction_role(self, ctx, message_id: str, emoji: str, role: discord.Role):
+        try:
+            message_id_int = int(message_id)
+            message = await ctx.channel.fetch_message(message_id_int)
+            
+            # Add reaction to the message
+            await message.add_reaction(emoji)
+            
+            # Store in database
+            await db.execute('''
+                INSERT OR REPLACE INTO reaction_roles (message_id, emoji, role_id, guild_id)
+                VALUES (?, ?, ?, ?)
+            ''', (message_id_int, emoji, role.id, ctx.guild.id))
+            self.index[(message_id_int, emoji)] = role.id
+            
+            embed = discord.Embed(
+                title="✅ Reaction Role Set",
+                description=f"Reaction {emoji} will give role {role.mention}",
+                color=discord.Color.green()
+            )
+            await ctx.respond(embed=embed, ephemeral=True)
+            
+        except discord.NotFound:
+            await ctx.respond("❌ Message not found.", ephemeral=True)
+        except ValueError:
+            await ctx.respond("❌ Invalid message ID.", ephemeral=True)
+        except Exception as e:
+            await ctx.respond(f"❌ An error occurred: {str(e)}", ephemeral=True)
+    
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        await self._handle_reaction(payload, add=True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        await self._handle_reaction(payload, add=False)
+
+    async def _handle_reaction(self, payload, add):
+        # Raw events fire for every message, cached or not, so anything that
+        # isn't a configured reaction role is dropped with a dict lookup
+        if not self.index_loaded.is_set():
+            await self.index_loaded.wait()
+
+        role_id = self.index.get((payload.message_id, str(payload.emoji)))
+        if role_id is None or payload.guild_id is None:
+            return
+        if payload.user_id == self.bot.user.id:
+            return
+
+        guild = self.bot.get_guild(payload.guild_id)
+        role = guild.get_role(role_id) if guild else None
+        if not role:
+            return
+
+        try:
+            # payload.member is only set for additions
+            member = payload.member or guild.get_member(payload.user_id)
+            if member is None:
+                member = await guild.fetch_member(payload.user_id)
+            if member.bot:
+                return
+
+            if add:
+                await member.add_roles(role)
+            else:
+                await member.remove_roles(role)
+        except (discord.Forbidden, discord.NotFound):
+            pass
+
+def setup(bot):
+    bot.add_cog(ReactionRolesCog(bot))
@@ -0,0 +1,94 @@
+import discord
+from discord.ext import commands
+from datetime import datetime
+
+# Service pricing data
+SERVICES = {
+    "logo_design": {
+        "name": "Logo Design",
+        "price": "$150 - $300",
+        "description": "Professional logo design with 3 revisions included",
+        "image": "https://via.placeholder.com/400x300/7289da/ffffff?text=Logo+Design",
+        "delivery": "3-5 business days"
+    },
+    "banner_design": {
+        "name": "Banner/Header Design",
+        "price": "$75 - $150",
+        "description": "Custom banners for social media, websites, or Discord servers",
+        "image": "https://via.placeholder.com/400x300/43b581/ffffff?text=Banner+Design",
+        "delivery": "1-3 business days"
+    },
+    "business_card": {
+        "name": "Business Card Design",
+        "price": "$50 - $100",
+        "description": "Professional business card design with print-ready files",
+        "image": "https://via.placeholder.com/400x300/faa61a/ffffff?text=Business+Card",
+        "delivery": "2-4 business days"
+    },
+    "branding_package": {
+        "name": "Complete Branding Package",
+        "price": "$500 - $1000",
+        "description": "Logo, business cards, letterhead, and brand guidelines",
+        "image": "https://via.placeholder.com/400x300/f04747/ffffff?text=Branding+Package",
+        "delivery": "7-10 business days"
+    }
+}
+
+class ServicesCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @commands.slash_command(name="services", description="Display available graphic design services")
+    async def services(self, ctx):
+        embed = discord.Embed(
+            title="🎨 Graphic Design Services",
+            description="Professional design services available",
+            color=discord.Color.purple(),
+            timestamp=datetime.utcnow()
+        )
+        
+        for service_key, service in SERVICES.items():
+            embed.add_field(
+                name=f"{service['name']} - {service['price']}",
+                value=f"{service['description']}\n⏱️ {service['delivery']}",
+                inline=False
+            )
+        
+        embed.set_footer(text="Use /service [name] for detailed information about a specific service")
+        await ctx.respond(embed=embed)
+    
+    @commands.slash_command(name="service", description="Get detailed information about a specific service")
+    async def service_detail(self, ctx, service_name: str):
+        # Find service by name (case insensitive partial match)
+        service = None
+        service_key = None
+        
+        for key, svc in SERVICES.items():
+            if service_name.lower() in svc['name'].lower() or service_name.lower() in key.lower():
+                service = svc
+                service_key = key
+                break
+        
+        if not service:
+            available_services = ", ".join([svc['name'] for svc in SERVICES.values()])
+            await ctx.respond(f"❌ Service not found. Available services: {available_services}", ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title=f"🎨 {service['name']}",
+            description=service['description'],
+            color=discord.Color.purple(),
+            timestamp=datetime.utcnow()
+        )
+        
+        embed.add_field(name="💰 Pricing", value=service['price'], inline=True)
+        embed.add_field(name="⏱️ Delivery Time", value=service['delivery'], inline=True)
+        embed.add_field(name="📞 Contact", value="DM for quotes and inquiries", inline=True)
+        
+        embed.set_image(url=service['image'])
+        embed.set_footer(text="Professional graphic design services • High quality guaranteed")
+        
+        await ctx.respond(embed=embed)
+
+def setup(bot):
+    bot.add_cog(ServicesCog(bot))
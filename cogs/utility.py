@@ -0,0 +1,286 @@
+import discord
+from discord.ext import commands
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+import logging
+from storage import db
+from scheduler import DeadlineScheduler
+from membercache import memory_usage
+from polls import CUSTOM_ID_PREFIX, MAX_OPTIONS, Poll
+from shared import cluster, member_cache, parse_time, polls, shard_metrics
+
+logger = logging.getLogger(__name__)
+
+# Backoff for giveaways that could not be finished because of a temporary error
+GIVEAWAY_RETRY_BASE = 30
+GIVEAWAY_RETRY_MAX = 3600
+
+class UtilityCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Only (end_time, message_id) is kept in memory, the rest stays in the database
+        self.giveaway_scheduler = DeadlineScheduler(self.end_giveaway, name="giveaways")
+        # message_id -> failed attempts to finish the giveaway
+        self.giveaway_retries = {}
+        cluster.register_scheduler(self.giveaway_scheduler)
+        self.bot.loop.create_task(self.load_giveaways())
+
+        self.poll_scheduler = DeadlineScheduler(self.end_poll, name="polls")
+        cluster.register_scheduler(self.poll_scheduler)
+        cluster.handler("end_poll")(self.end_local_poll)
+        polls.start(bot)
+        self.bot.loop.create_task(self.load_polls())
+
+    def cog_unload(self):
+        self.giveaway_scheduler.stop()
+        self.poll_scheduler.stop()
+
+    async def load_giveaways(self):
+        """Reschedule giveaways that were still running when the bot stopped"""
+        await self.bot.wait_until_ready()
+        await cluster.wait_leader()
+        rows = await db.fetchall('SELECT message_id, end_time FROM giveaways WHERE ended = 0')
+
+        for message_id, end_time in rows:
+            try:
+                when = datetime.fromisoformat(str(end_time))
+            except ValueError:
+                when = datetime.utcnow()
+            self.giveaway_scheduler.schedule(message_id, when)
+
+        self.giveaway_scheduler.start()
+        logger.info(f"Scheduled {len(rows)} running giveaways")
+
+    async def load_polls(self):
+        """Reschedule the end of polls that were still running when the bot stopped"""
+        await self.bot.wait_until_ready()
+        await cluster.wait_leader()
+        rows = await db.fetchall('SELECT message_id, end_time FROM polls WHERE closed = 0 AND end_time IS NOT NULL')
+
+        for message_id, end_time in rows:
+            try:
+                when = datetime.fromisoformat(str(end_time))
+            except ValueError:
+                when = datetime.utcnow()
+            self.poll_scheduler.schedule(message_id, when)
+
+        self.poll_scheduler.start()
+        logger.info(f"Scheduled {len(rows)} running polls")
+
+    async def end_poll(self, message_id):
+        if cluster.enabled and not polls.is_loaded(message_id):
+            # The worker whose shard receives the votes holds the live tally
+            if any(await cluster.broadcast("end_poll", message_id)):
+                return
+        await polls.end(message_id)
+
+    async def end_local_poll(self, message_id):
+        """Cluster handler: end the poll if this worker is tallying it"""
+        return polls.is_loaded(message_id) and await polls.end(message_id) is not None
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        custom_id = interaction.custom_id if interaction.type == discord.InteractionType.component else None
+        if not custom_id or not custom_id.startswith(CUSTOM_ID_PREFIX):
+            return
+
+        poll = await polls.get(interaction.message.id)
+        option = int(custom_id[len(CUSTOM_ID_PREFIX):])
+        if poll is None or poll.closed or option >= len(poll.options):
+            await interaction.response.send_message("❌ This poll is closed.", ephemeral=True)
+            return
+
+        # Only the in-memory tally changes here; the message is edited and the
+        # vote written to the database in batches by the PollTracker
+        choice = polls.vote(poll, interaction.user.id, option)
+        if choice is None:
+            await interaction.response.send_message("🗑️ Your vote was removed.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"✅ You voted for **{poll.options[choice]}**.", ephemeral=True)
+
+    @staticmethod
+    async def pick_winners(reaction, count=1):
+        """Pick random non-bot users from a reaction.
+
+        Entrants are streamed page by page and reservoir sampled, so memory
+        stays at ``count`` users no matter how many people entered.
+        """
+        winners = []
+        seen = 0
+        async for user in reaction.users(limit=None):
+            if user.bot:
+                continue
+            seen += 1
+            if len(winners) < count:
+                winners.append(user)
+            else:
+                slot = random.randrange(seen)
+                if slot < count:
+                    winners[slot] = user
+        return winners
+
+    async def end_giveaway(self, message_id):
+        row = await db.fetchone('''
+            SELECT channel_id, prize FROM giveaways WHERE message_id = ? AND ended = 0
+        ''', (message_id,))
+        if not row:
+            return
+        channel_id, prize = row
+        winner = None
+
+        try:
+            channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+            message = await channel.fetch_message(message_id)
+            reaction = discord.utils.get(message.reactions, emoji="🎉")
+
+            if reaction and reaction.count > 1:
+                winners = await self.pick_winners(reaction)
+                if winners:
+                    winner = winners[0]
+
+                    embed = discord.Embed(
+                        title="🎉 Giveaway Ended! 🎉",
+                        description=f"**Winner:** {winner.mention}\n**Prize:** {prize}",
+                        color=discord.Color.gold()
+                    )
+                    await message.reply(embed=embed)
+                else:
+                    await message.reply("❌ No valid entries for the giveaway.")
+            else:
+                await message.reply("❌ No one entered the giveaway.")
+        except (discord.NotFound, discord.Forbidden) as e:
+            # The message is gone or we lost access to it, retrying won't help
+            logger.warning(f"Could not finish giveaway {message_id}: {e}")
+            winner = None
+        except discord.HTTPException as e:
+            # Server errors and rate limits pass, try again later instead of ending without a winner
+            attempts = self.giveaway_retries.get(message_id, 0) + 1
+            self.giveaway_retries[message_id] = attempts
+            delay = min(GIVEAWAY_RETRY_BASE * 2 ** (attempts - 1), GIVEAWAY_RETRY_MAX)
+            logger.warning(f"Could not finish giveaway {message_id} (attempt {attempts}), retrying in {delay}s: {e}")
+            self.giveaway_scheduler.schedule(message_id, datetime.utcnow() + timedelta(seconds=delay))
+            return
+
+        self.giveaway_retries.pop(message_id, None)
+        await db.execute('UPDATE giveaways SET ended = 1, winner_id = ? WHERE message_id = ?',
+                         (winner.id if winner else None, message_id))
+    
+    @commands.slash_command(name="say", description="Bot repeats your message")
+    @commands.has_permissions(manage_messages=True)
+    async def say(self, ctx, *, message: str):
+        await ctx.channel.send(message)
+        await ctx.respond("✅ Message sent!", ephemeral=True)
+    
+    @commands.slash_command(name="poll", description="Create a poll with options")
+    async def poll(self, ctx, question: str, options: str, duration: str = None):
+        option_list = [opt.strip() for opt in options.split(',') if opt.strip()]
+        
+        if len(option_list) < 2 or len(option_list) > MAX_OPTIONS:
+            await ctx.respond(f"❌ Please provide 2-{MAX_OPTIONS} options separated by commas.", ephemeral=True)
+            return
+        
+        end_time = None
+        if duration:
+            duration_seconds = parse_time(duration)
+            if duration_seconds <= 0:
+                await ctx.respond("❌ Invalid duration format. Use d/h/m/s (e.g., 1h30m)", ephemeral=True)
+                return
+            end_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
+        
+        # Buttons go out with the message in one request, and results are
+        # tallied live instead of read back from reaction counts
+        poll = Poll(None, ctx.channel.id, ctx.guild.id, ctx.author.id, question, option_list, end_time=end_time)
+        await ctx.respond("Poll created!", ephemeral=True)
+        message = await ctx.followup.send(embed=poll.embed(), view=poll.view())
+        
+        poll.message_id = message.id
+        await polls.create(poll)
+        if end_time is not None:
+            cluster.schedule(self.poll_scheduler, message.id, end_time)
+    
+    @commands.slash_command(name="giveaway", description="Start a giveaway")
+    @commands.has_permissions(manage_messages=True)
+    async def giveaway(self, ctx, duration: str, *, prize: str):
+        # Parse duration
+        time_units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+        duration_seconds = 0
+        
+        if duration[-1] in time_units:
+            duration_seconds = int(duration[:-1]) * time_units[duration[-1]]
+        else:
+            await ctx.respond("❌ Invalid duration format. Use s/m/h/d (e.g., 1h, 30m)", ephemeral=True)
+            return
+        
+        end_time = datetime.utcnow() + timedelta(seconds=duration_seconds)
+        
+        embed = discord.Embed(
+            title="🎉 GIVEAWAY! 🎉",
+            description=f"**Prize:** {prize}\n\n**How to enter:** React with 🎉\n**Ends:** <t:{int(end_time.timestamp())}:R>",
+            color=discord.Color.gold(),
+            timestamp=end_time
+        )
+        embed.set_footer(text="Ends at")
+        
+        await ctx.respond("Giveaway started!", ephemeral=True)
+        message = await ctx.followup.send(embed=embed)
+        await message.add_reaction("🎉")
+        
+        # Persist the giveaway so it still ends after a restart
+        await db.execute('''
+            INSERT INTO giveaways (message_id, channel_id, guild_id, host_id, prize, end_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (message.id, ctx.channel.id, ctx.guild.id, ctx.author.id, prize, end_time))
+        cluster.schedule(self.giveaway_scheduler, message.id, end_time)
+    
+    @commands.slash_command(name="botinfo", description="Shows information about the bot")
+    async def botinfo(self, ctx):
+        embed = discord.Embed(
+            title="🤖 Bot Information",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        
+        embed.add_field(name="Bot Name", value=self.bot.user.name, inline=True)
+        embed.add_field(name="Bot ID", value=self.bot.user.id, inline=True)
+        embed.add_field(name="Created", value=f"<t:{int(self.bot.user.created_at.timestamp())}:F>", inline=True)
+        if cluster.enabled:
+            # Totals across every cluster process that answered
+            workers = await cluster.gather("stats")
+            embed.add_field(name="Servers", value=sum(worker["guilds"] for worker in workers), inline=True)
+            embed.add_field(name="Users", value=sum(worker["users"] for worker in workers), inline=True)
+            embed.add_field(name="Processes", value=f"{len(workers)} (this is #{cluster.cluster_id})", inline=True)
+        else:
+            embed.add_field(name="Servers", value=len(self.bot.guilds), inline=True)
+            embed.add_field(name="Users", value=len(self.bot.users), inline=True)
+        embed.add_field(name="Python Version", value="3.8+", inline=True)
+        embed.add_field(name="Discord.py Version", value=discord.__version__, inline=True)
+        embed.add_field(name="Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
+        embed.add_field(name="Shards", value=f"{len(self.bot.shards)} of {self.bot.shard_count}", inline=True)
+        memory = f"{member_cache.cached_count(self.bot):,} members cached ({member_cache.mode})"
+        rss = memory_usage()
+        if rss is not None:
+            memory = f"{rss / 2 ** 20:.0f} MB RSS\n{memory}"
+        embed.add_field(name="Memory (this process)" if cluster.enabled else "Memory", value=memory, inline=True)
+
+        guilds_per_shard = Counter(guild.shard_id for guild in self.bot.guilds)
+        shard_lines = []
+        for shard_id, shard in sorted(self.bot.shards.items())[:12]:
+            health = shard_metrics.get(shard_id)
+            latency = f"{round(shard.latency * 1000)}ms" if shard.latency == shard.latency else "n/a"
+            shard_lines.append(
+                f"`#{shard_id}` {latency} • {health.event_rate:.1f} ev/s • {guilds_per_shard[shard_id]} servers • "
+                f"{health.connects}/{health.resumes}/{health.disconnects}"
+            )
+        if len(self.bot.shards) > 12:
+            shard_lines.append(f"... and {len(self.bot.shards) - 12} more")
+        if shard_lines:
+            embed.add_field(name="Shard Health (connects/resumes/drops)", value="\n".join(shard_lines), inline=False)
+        
+        embed.set_thumbnail(url=self.bot.user.avatar.url if self.bot.user.avatar else None)
+        embed.set_footer(text="Professional Discord Bot for Graphic Design Services")
+        
+        await ctx.respond(embed=embed)
+
+def setup(bot):
+    bot.add_cog(UtilityCog(bot))
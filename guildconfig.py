@@ -0,0 +1,77 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Setting name -> type its stored text is converted to
+SETTINGS = {
+    'muted_role': int,
+    'welcome_channel': int,
+    'modlog_channel': int,
+    'prefix': str,
+}
+
+# Settings that hold a role or channel ID
+ID_SETTINGS = ('muted_role', 'welcome_channel', 'modlog_channel')
+
+
+class GuildConfig:
+    """Per-guild settings from the guild_settings table, cached in memory.
+
+    A guild's settings are read with one query the first time they're needed
+    and kept as a dict, so lookups on hot paths (every message, join or mute)
+    are a dict access. Writes go to the database and update the cache in
+    place; roles and channels are stored by ID, never by name.
+    """
+
+    def __init__(self, database):
+        self.db = database
+        # guild_id -> {setting: value}
+        self._settings = {}
+
+    def cached(self, guild_id):
+        """The guild's settings if they are already loaded, else None"""
+        return self._settings.get(guild_id)
+
+    async def load(self, guild_id):
+        settings = self._settings.get(guild_id)
+        if settings is None:
+            rows = await self.db.fetchall('SELECT key, value FROM guild_settings WHERE guild_id = ?', (guild_id,))
+            settings = {}
+            for key, value in rows:
+                convert = SETTINGS.get(key)
+                if convert is not None:
+                    settings[key] = convert(value)
+            # Another load may have finished while we waited, keep its dict
+            settings = self._settings.setdefault(guild_id, settings)
+        return settings
+
+    async def get(self, guild_id, key, default=None):
+        settings = await self.load(guild_id)
+        return settings.get(key, default)
+
+    async def set(self, guild_id, key, value):
+        """Store a setting, or remove it when ``value`` is None"""
+        if key not in SETTINGS:
+            raise KeyError(key)
+
+        settings = await self.load(guild_id)
+        if value is None:
+            await self.db.execute('DELETE FROM guild_settings WHERE guild_id = ? AND key = ?', (guild_id, key))
+            settings.pop(key, None)
+        else:
+            value = SETTINGS[key](value)
+            await self.db.execute('''
+                INSERT OR REPLACE INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)
+            ''', (guild_id, key, str(value)))
+            settings[key] = value
+
+    async def forget_id(self, guild_id, object_id):
+        """Drop settings pointing at a role or channel that was deleted"""
+        settings = await self.load(guild_id)
+        for key in ID_SETTINGS:
+            if settings.get(key) == object_id:
+                await self.set(guild_id, key, None)
+                logger.info(f"Cleared {key} for guild {guild_id}: {object_id} was deleted")
+
+    def invalidate(self, guild_id):
+        self._settings.pop(guild_id, None)
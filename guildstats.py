@@ -0,0 +1,108 @@
+import time
+
+# Statuses shown by /stats; invisible members look offline to everyone else
+STATUSES = ("online", "idle", "dnd", "offline")
+
+
+def _status_key(status):
+    status = str(status)
+    return status if status in STATUSES else "offline"
+
+
+class GuildStats:
+    """Member counts for one guild, kept up to date from gateway events"""
+
+    __slots__ = ("statuses", "bots")
+
+    def __init__(self):
+        self.statuses = dict.fromkeys(STATUSES, 0)
+        self.bots = 0
+
+    @classmethod
+    def from_guild(cls, guild):
+        # The one full pass over the member list, done when a guild becomes available
+        stats = cls()
+        for member in guild.members:
+            stats.add(member)
+        return stats
+
+    def add(self, member, amount=1):
+        key = _status_key(member.status)
+        self.statuses[key] = max(0, self.statuses[key] + amount)
+        if member.bot:
+            self.bots = max(0, self.bots + amount)
+
+    def remove(self, member):
+        self.add(member, -1)
+
+    def move(self, before, after):
+        old, new = _status_key(before), _status_key(after)
+        if old != new:
+            self.statuses[old] = max(0, self.statuses[old] - 1)
+            self.statuses[new] += 1
+
+
+class StatsTracker:
+    """Per-guild stats plus a short-lived cache of the embeds built from them.
+
+    Reading the counts is O(1); the member list is only walked when a guild is
+    first seen (or resynced after a reconnect). Rendered embeds are reused for
+    ``ttl`` seconds so spamming /stats doesn't rebuild them every time.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self.guilds = {}
+        # (guild_id, name) -> (expires, embed)
+        self._embeds = {}
+
+    def rebuild(self, guild):
+        self.guilds[guild.id] = GuildStats.from_guild(guild)
+        self.invalidate(guild.id)
+
+    def forget(self, guild_id):
+        self.guilds.pop(guild_id, None)
+        self.invalidate(guild_id)
+
+    def get(self, guild):
+        stats = self.guilds.get(guild.id)
+        if stats is None:
+            stats = self.guilds[guild.id] = GuildStats.from_guild(guild)
+        return stats
+
+    def member_join(self, member):
+        stats = self.guilds.get(member.guild.id)
+        if stats is not None:
+            stats.add(member)
+
+    def member_remove(self, member):
+        stats = self.guilds.get(member.guild.id)
+        if stats is not None:
+            stats.remove(member)
+
+    def presence_update(self, before, after):
+        stats = self.guilds.get(after.guild.id)
+        if stats is not None:
+            stats.move(before.status, after.status)
+
+    def invalidate(self, guild_id):
+        for key in [key for key in self._embeds if key[0] == guild_id]:
+            del self._embeds[key]
+
+    def cached(self, guild_id, name):
+        """The embed stored under ``name`` less than ``ttl`` seconds ago, else None"""
+        cached = self._embeds.get((guild_id, name))
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def store(self, guild_id, name, embed):
+        self._embeds[(guild_id, name)] = (time.monotonic() + self.ttl, embed)
+        return embed
+
+    def cached_embed(self, guild, name, build):
+        """Return the embed ``build(guild)`` made less than ``ttl`` seconds ago"""
+        embed = self.cached(guild.id, name)
+        if embed is None:
+            embed = self.store(guild.id, name, build(guild))
+        return embed
@@ -0,0 +1,82 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Keep 1 in N records below WARNING from chatty loggers
+SAMPLE_RATES = {
+    'discord.gateway': 10,
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            # QueueHandler has already merged any traceback into the message
+            'message': record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through every Nth low-severity record per configured logger.
+
+    Warnings and errors always pass. Applied before a record is queued, so
+    dropped records cost almost nothing.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self.counters = dict.fromkeys(rates, 0)
+
+    def filter(self, record):
+        rate = self.rates.get(record.name)
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        count = self.counters[record.name]
+        self.counters[record.name] = count + 1
+        return count % rate == 0
+
+
+def setup_logging(path='bot.log', level=logging.INFO, json_format=False,
+                  max_bytes=10 * 1024 * 1024, backup_count=5, sample_rates=SAMPLE_RATES):
+    """Route all logging through a queue drained by a background thread.
+
+    The event loop only pays for putting the record on the queue; formatting,
+    writing and rotating ``path`` happen on the listener thread. Returns the
+    listener, which is stopped (and the queue flushed) at interpreter exit.
+    """
+    formatter = JSONFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler,
+                                              respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
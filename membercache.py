@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+def memory_usage():
+    """Resident set size of this process in bytes, or None if unknown"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current usage, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class MemberCachePolicy:
+    """Decides which guild members stay in discord.py's member cache.
+
+    ``all`` is discord.py's default: every guild is chunked at startup and a
+    member stays cached until they leave. ``active`` skips chunking at
+    startup and only keeps members the bot is likely to need again:
+
+    * members who sent a message or joined in the last ``ttl`` seconds
+    * members holding a protected role (reaction roles, the Muted role)
+    * the bot itself and the guild owner
+
+    Everyone else is dropped by a sweep every ``sweep_interval`` seconds and
+    requested again over the gateway when a command needs them.
+    """
+
+    def __init__(self, mode='all', ttl=900, sweep_interval=300):
+        if mode not in ('all', 'active'):
+            raise ValueError(f"Unknown member cache mode {mode!r}, expected 'all' or 'active'")
+        self.mode = mode
+        self.enabled = mode == 'active'
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        # Returns the role IDs whose holders are never dropped
+        self.protected_roles = set
+        # (guild_id, user_id) -> monotonic time the member was last active
+        self.last_seen = {}
+        self._task = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv('MEMBER_CACHE', 'all').lower(), int(os.getenv('MEMBER_CACHE_TTL', 900)))
+
+    def bot_options(self):
+        """Keyword arguments for the bot's constructor"""
+        return {'chunk_guilds_at_startup': False} if self.enabled else {}
+
+    @staticmethod
+    def cached_count(bot):
+        return sum(len(guild._members) for guild in bot.guilds)
+
+    def touch(self, member):
+        if self.enabled:
+            self.last_seen[(member.guild.id, member.id)] = time.monotonic()
+
+    def message(self, message):
+        """Keep the author of ``message`` cached for the next ``ttl`` seconds"""
+        if not self.enabled or not isinstance(message.author, discord.Member):
+            return
+        self.touch(message.author)
+        if message.guild.get_member(message.author.id) is None:
+            # discord.py only builds the author from the message, cache it ourselves
+            message.guild._add_member(message.author)
+
+    async def get_member(self, guild, user_id):
+        """The cached member, else requested over the gateway with their presence.
+
+        Returns None if they are not in the guild. Members resolved from a
+        slash command option are usable without this, but have no status or
+        activities unless they were cached.
+        """
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+        try:
+            members = await guild.query_members(user_ids=[user_id], presences=True, cache=True)
+        except asyncio.TimeoutError:
+            members = []
+        if not members:
+            return None
+        self.touch(members[0])
+        return members[0]
+
+    async def fetch_members(self, guild, user_ids):
+        """``{user_id: member}`` for the IDs that belong to guild members.
+
+        Uncached members are requested over the gateway, 100 IDs at a time,
+        without adding them to the cache. An ID missing from the result is
+        not in the guild. Raises ``asyncio.TimeoutError`` if the gateway
+        doesn't answer, since nobody can be ruled out as a member then.
+        """
+        found = {}
+        missing = []
+        for user_id in user_ids:
+            member = guild.get_member(user_id)
+            if member is not None:
+                found[user_id] = member
+            else:
+                missing.append(user_id)
+        for i in range(0, len(missing), 100):
+            batch = missing[i:i + 100]
+            for member in await guild.query_members(user_ids=batch, limit=len(batch), cache=False):
+                found[member.id] = member
+        return found
+
+    async def chunk(self, guild):
+        """Load the whole member list of ``guild`` before a command walks it"""
+        if self.enabled and not guild.chunked:
+            await guild.chunk()
+
+    def sweep(self, bot):
+        """Drop members nothing is keeping cached; returns how many were dropped"""
+        cutoff = time.monotonic() - self.ttl
+        self.last_seen = {key: seen for key, seen in self.last_seen.items() if seen > cutoff}
+        joined_cutoff = discord.utils.utcnow() - timedelta(seconds=self.ttl)
+        protected = self.protected_roles()
+
+        dropped = 0
+        for guild in bot.guilds:
+            keep = {bot.user.id, guild.owner_id}
+            for member in guild.members:
+                if member.id in keep or (guild.id, member.id) in self.last_seen:
+                    continue
+                if member.joined_at is not None and member.joined_at > joined_cutoff:
+                    continue
+                # _roles holds the raw IDs; member.roles would build a Role list per member
+                if not protected.isdisjoint(member._roles):
+                    continue
+                guild._remove_member(member)
+                dropped += 1
+        return dropped
+
+    async def _run(self, bot):
+        while not bot.is_closed():
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                dropped = self.sweep(bot)
+            except Exception as e:
+                logger.warning(f"Member cache sweep failed: {e}")
+            else:
+                if dropped:
+                    logger.info(f"Dropped {dropped} inactive members from the member cache")
+
+    def start(self, bot):
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = bot.loop.create_task(self._run(bot))
@@ -0,0 +1,191 @@
+import bisect
+import logging
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers a cached dict lookup up to a slow multi-request command
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for labels, value in self.values.items():
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, *labels, value):
+        self.values[labels] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus text format"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self.values = {}
+
+    def observe(self, *labels, value):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class Metrics:
+    """Timing for commands, event handlers and database calls.
+
+    Nothing is wrapped until :meth:`install` runs, so with metrics disabled
+    the hot paths are exactly as they were. Values are kept in plain dicts
+    (everything runs on the event loop) and rendered on each scrape of the
+    HTTP endpoint started by :meth:`serve`.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.commands = Histogram('bot_command_duration_seconds', 'Slash command run time', ('command',))
+        self.command_errors = Counter('bot_command_errors_total', 'Slash commands that raised', ('command',))
+        self.events = Histogram('bot_event_duration_seconds', 'Event handler run time', ('event',))
+        self.event_errors = Counter('bot_event_errors_total', 'Event handlers that raised', ('event',))
+        self.queries = Histogram('bot_db_duration_seconds', 'Database call time including queueing', ('operation',))
+        self.guilds = Gauge('bot_guilds', 'Guilds this process is in')
+        self.latency = Gauge('bot_gateway_latency_seconds', 'Heartbeat latency per shard', ('shard',))
+        self.pending_writes = Gauge('bot_pending_writes', 'Writes waiting in the write-behind queue')
+        self._collectors = []
+        self._runner = None
+
+    def collector(self, func):
+        """Register ``func()`` to refresh gauges right before each scrape"""
+        self._collectors.append(func)
+        return func
+
+    def install(self, bot, database):
+        """Wrap the bot's command and event dispatch and the database executor"""
+        self.enabled = True
+        metrics = self
+
+        invoke = bot.invoke_application_command
+
+        @wraps(invoke)
+        async def invoke_application_command(ctx):
+            started = time.perf_counter()
+            try:
+                await invoke(ctx)
+            finally:
+                metrics.commands.observe(ctx.command.qualified_name, value=time.perf_counter() - started)
+
+        run_event = bot._run_event
+
+        @wraps(run_event)
+        async def _run_event(coro, event_name, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                await run_event(coro, event_name, *args, **kwargs)
+            finally:
+                metrics.events.observe(event_name, value=time.perf_counter() - started)
+
+        on_error = bot.on_error
+
+        @wraps(on_error)
+        async def on_error_counted(event_method, *args, **kwargs):
+            metrics.event_errors.inc(event_method)
+            await on_error(event_method, *args, **kwargs)
+
+        submit = database._submit
+
+        @wraps(submit)
+        async def _submit(func, *args):
+            started = time.perf_counter()
+            try:
+                return await submit(func, *args)
+            finally:
+                metrics.queries.observe(func.__name__.lstrip('_'), value=time.perf_counter() - started)
+
+        bot.invoke_application_command = invoke_application_command
+        bot._run_event = _run_event
+        bot.on_error = on_error_counted
+        database._submit = _submit
+
+        @bot.listen()
+        async def on_application_command_error(ctx, error):
+            metrics.command_errors.inc(ctx.command.qualified_name if ctx.command else 'unknown')
+
+    def render(self):
+        for func in self._collectors:
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+
+        lines = []
+        for metric in (self.commands, self.command_errors, self.events, self.event_errors,
+                       self.queries, self.guilds, self.latency, self.pending_writes):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    async def serve(self, host='127.0.0.1', port=9100):
+        if self._runner is not None:
+            return
+        # aiohttp comes with discord.py; only needed when metrics are on
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(body=self.render().encode(),
+                                headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,82 @@
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CASE_COLUMNS = 'case_number, action, user_id, moderator_id, reason, duration, created_at'
+
+
+def fts_query(text):
+    """FTS5 query matching every word of ``text``.
+
+    Each word is quoted so characters like ``-``, ``*`` or ``OR`` in what a
+    moderator typed are searched for literally instead of parsed as syntax.
+    """
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class CaseLog:
+    """Numbered moderation cases per guild, stored in ``mod_cases``.
+
+    The next case number for a guild is read from the database the first
+    time it is needed and handed out from memory afterwards, so recording a
+    case costs no query; the row goes through the write-behind queue with
+    warnings and mutes. Each guild is only handled by the process running
+    its shard, so the counters need no coordination across a cluster.
+    """
+
+    def __init__(self, database, writer):
+        self.db = database
+        self.writer = writer
+        # guild_id -> next case number
+        self._next = {}
+
+    async def record(self, guild_id, action, user_id, moderator_id, reason=None, duration=None):
+        """Queue a case and return its number"""
+        number = self._next.get(guild_id)
+        if number is None:
+            row = await self.db.fetchone('SELECT MAX(case_number) FROM mod_cases WHERE guild_id = ?', (guild_id,))
+            # Another record() for this guild may have loaded it while we waited
+            number = self._next.setdefault(guild_id, (row[0] or 0) + 1)
+        self._next[guild_id] = number + 1
+
+        self.writer.add_case(guild_id, number, action, user_id, moderator_id, reason, duration,
+                             datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'))
+        return number
+
+    async def get(self, guild_id, case_number):
+        await self.writer.flush()
+        return await self.db.fetchone(f'''
+            SELECT {CASE_COLUMNS} FROM mod_cases WHERE guild_id = ? AND case_number = ?
+        ''', (guild_id, case_number))
+
+    async def history(self, guild_id, user_id=None, search=None, before=None, limit=10):
+        """Newest cases first, optionally for one user and/or matching ``search``.
+
+        ``before`` continues below a case number from the previous page.
+        """
+        await self.writer.flush()
+
+        conditions = ['c.guild_id = ?', 'c.case_number < ?']
+        params = [guild_id, before or 2 ** 63 - 1]
+        if user_id is not None:
+            conditions.append('c.user_id = ?')
+            params.append(user_id)
+
+        if search and search.split():
+            # The full-text index finds matching reasons without scanning every case
+            sql = f'''
+                SELECT {', '.join('c.' + column for column in CASE_COLUMNS.split(', '))}
+                FROM mod_cases_fts JOIN mod_cases c ON c.id = mod_cases_fts.rowid
+                WHERE mod_cases_fts MATCH ? AND {' AND '.join(conditions)}
+                ORDER BY c.case_number DESC LIMIT ?
+            '''
+            params.insert(0, fts_query(search))
+        else:
+            sql = f'''
+                SELECT {CASE_COLUMNS} FROM mod_cases c
+                WHERE {' AND '.join(conditions)}
+                ORDER BY c.case_number DESC LIMIT ?
+            '''
+        params.append(limit)
+        return await self.db.fetchall(sql, params)
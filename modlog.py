@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord accepts at most 10 embeds in one message, with 6000 characters between them
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_EMBED_CHARS = 6000
+
+
+def embed_batches(embeds):
+    """Split ``embeds`` into groups that each fit in one message"""
+    batches = []
+    size = 0
+    for embed in embeds:
+        length = len(embed)
+        if not batches or len(batches[-1]) == EMBEDS_PER_MESSAGE or size + length > MESSAGE_EMBED_CHARS:
+            batches.append([])
+            size = 0
+        batches[-1].append(embed)
+        size += length
+    return batches
+
+
+class ModLog:
+    """Queues moderation embeds per guild and posts them to the mod-log channel.
+
+    Entries are buffered for ``flush_interval`` seconds and then sent as many
+    embeds per message as Discord allows, so a burst of actions costs a few
+    sends instead of one per entry. Entries that fail to send for a
+    temporary reason are queued again for the next flush. A guild's backlog
+    is capped at ``max_queued``; the oldest entries are dropped first if the
+    channel can't keep up.
+    """
+
+    def __init__(self, config, flush_interval=3.0, max_queued=500):
+        # GuildConfig holding each guild's modlog_channel
+        self.config = config
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        # guild_id -> (guild, queued embeds)
+        self._queues = {}
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    def log(self, guild, embed):
+        """Queue ``embed`` for the guild's mod-log; never blocks or raises"""
+        settings = self.config.cached(guild.id)
+        if settings is not None and 'modlog_channel' not in settings:
+            # Known to have no mod-log channel
+            return
+        entry = self._queues.get(guild.id)
+        if entry is None:
+            entry = self._queues[guild.id] = (guild, deque(maxlen=self.max_queued))
+        entry[1].append(embed)
+        self._schedule()
+
+    def _schedule(self):
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    def _requeue(self, guild, embeds):
+        """Put ``embeds`` back in front of anything logged since the flush"""
+        queue = deque(embeds, maxlen=self.max_queued)
+        entry = self._queues.get(guild.id)
+        if entry is not None:
+            queue.extend(entry[1])
+        self._queues[guild.id] = (guild, queue)
+        self._schedule()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def _deliver(self, guild, embeds):
+        channel_id = await self.config.get(guild.id, 'modlog_channel')
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if channel is None:
+            return
+
+        batches = embed_batches(embeds)
+        for index, batch in enumerate(batches):
+            try:
+                await channel.send(embeds=batch)
+            except discord.Forbidden:
+                logger.warning(f"Cannot post to the mod-log channel in guild {guild.id}")
+                return
+            except discord.HTTPException as e:
+                if e.status == 400:
+                    # Discord rejected the entries themselves, sending them again won't help
+                    logger.warning(f"Dropped {len(batch)} mod-log entries Discord rejected: {e}")
+                    continue
+                retry = [embed for remaining in batches[index:] for embed in remaining]
+                logger.warning(f"Failed to post {len(retry)} mod-log entries, retrying later: {e}")
+                self._requeue(guild, retry)
+                return
+
+    async def flush(self):
+        """Send everything queued so far"""
+        async with self._lock:
+            queues, self._queues = self._queues, {}
+            await asyncio.gather(*(self._deliver(guild, list(queue)) for guild, queue in queues.values()))
+
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+
+def action_embed(title, color, target=None, moderator=None, reason=None, **fields):
+    """Embed for actions that aren't already described by a command's reply"""
+    embed = discord.Embed(title=title, color=color, timestamp=discord.utils.utcnow())
+    if target is not None:
+        embed.add_field(name="User", value=f"{target.mention} ({target})", inline=False)
+    if moderator is not None:
+        embed.add_field(name="Moderator", value=moderator.mention, inline=True)
+    for name, value in fields.items():
+        embed.add_field(name=name.replace("_", " ").title(), value=value, inline=True)
+    if reason:
+        # Field values hold at most 1024 characters
+        embed.add_field(name="Reason", value=reason[:1024], inline=False)
+    if target is not None:
+        embed.set_footer(text=f"ID: {target.id}")
+    return embed
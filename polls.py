@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+NUMBER_EMOJIS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣', '8️⃣', '9️⃣', '🔟']
+MAX_OPTIONS = len(NUMBER_EMOJIS)
+# Vote buttons carry "poll:<option index>"; the message they are on identifies the poll
+CUSTOM_ID_PREFIX = 'poll:'
+BAR_WIDTH = 12
+
+
+class Poll:
+    """One poll's options and votes, with the tally kept alongside"""
+
+    __slots__ = ('message_id', 'channel_id', 'guild_id', 'author_id', 'question', 'options',
+                 'end_time', 'votes', 'counts', 'closed', 'last_vote')
+
+    def __init__(self, message_id, channel_id, guild_id, author_id, question, options, end_time=None, votes=None):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.author_id = author_id
+        self.question = question
+        self.options = options
+        self.end_time = end_time
+        # user_id -> option index
+        self.votes = votes or {}
+        self.counts = [0] * len(options)
+        for option in self.votes.values():
+            self.counts[option] += 1
+        self.closed = False
+        self.last_vote = time.monotonic()
+
+    @property
+    def total(self):
+        return len(self.votes)
+
+    def vote(self, user_id, option):
+        """Vote for ``option``, or take the vote back if it was already theirs.
+
+        Returns the user's option afterwards, None if they no longer vote.
+        """
+        previous = self.votes.get(user_id)
+        if previous is not None:
+            self.counts[previous] -= 1
+        self.last_vote = time.monotonic()
+
+        if previous == option:
+            del self.votes[user_id]
+            return None
+        self.votes[user_id] = option
+        self.counts[option] += 1
+        return option
+
+    def embed(self):
+        embed = discord.Embed(
+            title="📊 Poll (closed)" if self.closed else "📊 Poll",
+            description=self.question,
+            color=discord.Color.dark_grey() if self.closed else discord.Color.blue()
+        )
+        leader = max(self.counts) if self.total else None
+        for index, option in enumerate(self.options):
+            count = self.counts[index]
+            share = count / self.total if self.total else 0
+            filled = round(share * BAR_WIDTH)
+            name = f"{NUMBER_EMOJIS[index]} {option}"
+            if self.closed and count == leader:
+                name += " 🏆"
+            embed.add_field(
+                name=name[:256],
+                value=f"`{'█' * filled}{'░' * (BAR_WIDTH - filled)}` {count} ({share:.0%})",
+                inline=False
+            )
+
+        details = [f"Started by <@{self.author_id}>", f"**{self.total}** votes"]
+        if self.end_time is not None:
+            verb = "Ended" if self.closed else "Ends"
+            details.append(f"{verb} <t:{int(self.end_time.replace(tzinfo=timezone.utc).timestamp())}:R>")
+        embed.add_field(name="\u200b", value=" • ".join(details), inline=False)
+        return embed
+
+    def view(self):
+        """Vote buttons for the poll message.
+
+        The view is never stored by discord.py; clicks are routed by custom ID
+        to :meth:`PollTracker.vote` instead, so they keep working after a
+        restart without a view object per poll.
+        """
+        buttons = [
+            discord.ui.Button(label=option[:80], emoji=NUMBER_EMOJIS[index], row=index // 5,
+                              custom_id=f"{CUSTOM_ID_PREFIX}{index}", style=discord.ButtonStyle.secondary)
+            for index, option in enumerate(self.options)
+        ]
+        return discord.ui.View(*buttons, timeout=None, store=False)
+
+
+class PollTracker:
+    """Running polls, tallied in memory.
+
+    A vote only updates the in-memory tally. Vote changes are coalesced per
+    user and written to ``poll_votes`` in one transaction once
+    ``flush_interval`` seconds have passed or ``max_pending`` changes are
+    waiting, and the poll message is edited at most once per ``edit_delay``
+    seconds however many votes come in. Votes from the last ``flush_interval``
+    seconds can be lost if the process is killed.
+
+    Polls nobody voted on for ``idle_ttl`` seconds are dropped from memory
+    after a flush and loaded again from the database on the next vote.
+    """
+
+    def __init__(self, database, edit_delay=3.0, flush_interval=10.0, max_pending=500, idle_ttl=3600):
+        self.db = database
+        self.edit_delay = edit_delay
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.idle_ttl = idle_ttl
+        self.bot = None
+        # message_id -> Poll
+        self._polls = {}
+        # (message_id, user_id) -> option index, or None for a withdrawn vote
+        self._pending = {}
+        # message_id -> task editing the poll message
+        self._edits = {}
+        self._lock = asyncio.Lock()
+        self._load_lock = asyncio.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._polls)
+
+    def start(self, bot):
+        self.bot = bot
+
+    def is_loaded(self, message_id):
+        return message_id in self._polls
+
+    async def create(self, poll):
+        await self.db.execute('''
+            INSERT INTO polls (message_id, channel_id, guild_id, author_id, question, options, end_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (poll.message_id, poll.channel_id, poll.guild_id, poll.author_id, poll.question,
+              '\n'.join(poll.options), poll.end_time))
+        self._polls[poll.message_id] = poll
+
+    async def get(self, message_id):
+        """The running poll on ``message_id``, loaded from the database if needed"""
+        poll = self._polls.get(message_id)
+        if poll is not None:
+            return poll
+
+        async with self._load_lock:
+            poll = self._polls.get(message_id)
+            if poll is not None:
+                return poll
+            row = await self.db.fetchone('''
+                SELECT channel_id, guild_id, author_id, question, options, end_time
+                FROM polls WHERE message_id = ? AND closed = 0
+            ''', (message_id,))
+            if row is None:
+                return None
+            channel_id, guild_id, author_id, question, options, end_time = row
+            votes = await self.db.fetchall('SELECT user_id, option FROM poll_votes WHERE message_id = ?',
+                                           (message_id,))
+            poll = Poll(message_id, channel_id, guild_id, author_id, question, options.split('\n'),
+                        end_time=datetime.fromisoformat(str(end_time)) if end_time else None,
+                        votes=dict(votes))
+            self._polls[message_id] = poll
+            return poll
+
+    def vote(self, poll, user_id, option):
+        """Record a vote; returns the user's option afterwards (see :meth:`Poll.vote`)"""
+        choice = poll.vote(user_id, option)
+        self._pending[(poll.message_id, user_id)] = choice
+        self._schedule_flush()
+        if poll.message_id not in self._edits:
+            self._edits[poll.message_id] = asyncio.get_running_loop().create_task(self._edit_later(poll))
+        return choice
+
+    async def _edit_later(self, poll):
+        try:
+            await asyncio.sleep(self.edit_delay)
+        finally:
+            self._edits.pop(poll.message_id, None)
+        await self._edit(poll)
+
+    async def _edit(self, poll, **kwargs):
+        message = self.bot.get_partial_messageable(poll.channel_id).get_partial_message(poll.message_id)
+        try:
+            await message.edit(embed=poll.embed(), **kwargs)
+        except discord.NotFound:
+            logger.info(f"Poll message {poll.message_id} was deleted")
+        except discord.HTTPException as e:
+            logger.warning(f"Failed to update poll {poll.message_id}: {e}")
+
+    def _schedule_flush(self):
+        loop = asyncio.get_running_loop()
+        if len(self._pending) >= self.max_pending:
+            loop.create_task(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    @staticmethod
+    def _write_votes(conn, votes):
+        upserts = [(message_id, user_id, option)
+                   for (message_id, user_id), option in votes.items() if option is not None]
+        deletes = [key for key, option in votes.items() if option is None]
+        if upserts:
+            conn.executemany('''
+                INSERT INTO poll_votes (message_id, user_id, option) VALUES (?, ?, ?)
+                ON CONFLICT (message_id, user_id) DO UPDATE SET option = excluded.option
+            ''', upserts)
+        if deletes:
+            conn.executemany('DELETE FROM poll_votes WHERE message_id = ? AND user_id = ?', deletes)
+
+    async def flush(self):
+        """Write every vote change so far in one transaction"""
+        async with self._lock:
+            if self._pending:
+                votes, self._pending = self._pending, {}
+                try:
+                    await self.db.transaction(self._write_votes, votes)
+                except Exception as e:
+                    logger.error(f"Failed to flush {len(votes)} poll votes: {e}")
+                    # Newer changes for the same user win over the failed batch
+                    votes.update(self._pending)
+                    self._pending = votes
+                    self._schedule_flush()
+                    return
+
+            # Everything voted on before the cutoff is on disk, so it can be reloaded
+            cutoff = time.monotonic() - self.idle_ttl
+            for message_id in [message_id for message_id, poll in self._polls.items()
+                               if poll.last_vote < cutoff and message_id not in self._edits]:
+                del self._polls[message_id]
+
+    async def end(self, message_id):
+        """Close a poll, showing the final results without buttons.
+
+        Returns the closed :class:`Poll`, or None if it was not running.
+        """
+        poll = await self.get(message_id)
+        if poll is None:
+            return None
+        poll.closed = True
+        edit = self._edits.pop(message_id, None)
+        if edit is not None:
+            edit.cancel()
+
+        await self.flush()
+        await self.db.execute('UPDATE polls SET closed = 1 WHERE message_id = ?', (message_id,))
+        self._polls.pop(message_id, None)
+        await self._edit(poll, view=None)
+        return poll
+
+    async def close(self):
+        """Write out pending votes and apply pending edits before shutdown"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        edits, self._edits = self._edits, {}
+        for task in edits.values():
+            task.cancel()
+        await self.flush()
+        await asyncio.gather(*(self._edit(self._polls[message_id]) for message_id in edits
+                               if message_id in self._polls))
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import re
+import time
+from datetime import timedelta
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord refuses bulk deletes of messages older than 14 days; keep a margin
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_DELETE_SIZE = 100
+# History scanned per channel before giving up on finding more matches
+MAX_SCAN_PER_CHANNEL = 10000
+
+
+class PurgeFilter:
+    """Decides which messages a purge deletes"""
+
+    def __init__(self, author_id=None, pattern=None, max_age=None, attachments=None):
+        self.author_id = author_id
+        self.pattern = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.max_age = max_age
+        # True: only messages with attachments, False: only without, None: either
+        self.attachments = attachments
+
+    def after(self):
+        """Oldest creation time worth scanning, or None for no bound"""
+        if self.max_age is None:
+            return None
+        return discord.utils.utcnow() - self.max_age
+
+    def matches(self, message):
+        if message.pinned:
+            return False
+        if self.author_id is not None and message.author.id != self.author_id:
+            return False
+        if self.attachments is not None and bool(message.attachments) != self.attachments:
+            return False
+        if self.pattern is not None and not self.pattern.search(message.content):
+            return False
+        return True
+
+
+class PurgeJob:
+    """Deletes matching messages from several channels in parallel.
+
+    History is streamed newest first and never held in full: matches younger
+    than 14 days are collected into batches of 100 for one bulk delete call,
+    older ones go through the single-delete endpoint one at a time. Every
+    request draws from the shared ``budget`` so parallel channels can't exceed
+    the global rate limit together.
+    """
+
+    def __init__(self, message_filter, limit, budget, concurrency=3):
+        self.filter = message_filter
+        self.remaining = limit
+        self.budget = budget
+        self.concurrency = concurrency
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+    async def _bulk_delete(self, channel, batch):
+        await self.budget.acquire()
+        try:
+            if len(batch) == 1:
+                await batch[0].delete()
+            else:
+                await channel.delete_messages(batch)
+            self.deleted += len(batch)
+        except discord.HTTPException as e:
+            logger.warning(f"Bulk delete of {len(batch)} messages in #{channel} failed: {e}")
+            self.failed += len(batch)
+
+    async def _single_delete(self, message):
+        await self.budget.acquire()
+        try:
+            await message.delete()
+            self.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
+            self.failed += 1
+
+    async def purge_channel(self, channel):
+        bulk_cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        batch = []
+
+        async for message in channel.history(limit=MAX_SCAN_PER_CHANNEL, after=self.filter.after(),
+                                             oldest_first=False):
+            if self.remaining <= 0:
+                break
+            self.scanned += 1
+            if not self.filter.matches(message):
+                continue
+
+            # Reserve the slot now so parallel channels don't overshoot the limit
+            self.remaining -= 1
+            if message.created_at > bulk_cutoff:
+                batch.append(message)
+                if len(batch) == BULK_DELETE_SIZE:
+                    await self._bulk_delete(channel, batch)
+                    batch = []
+            else:
+                await self._single_delete(message)
+
+        if batch:
+            await self._bulk_delete(channel, batch)
+
+    async def run(self, channels):
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(channel):
+            async with semaphore:
+                try:
+                    await self.purge_channel(channel)
+                except discord.HTTPException as e:
+                    logger.warning(f"Purge of #{channel} stopped: {e}")
+
+        await asyncio.gather(*(worker(channel) for channel in channels))
+        self.elapsed = time.monotonic() - started
+        return self
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import discord
+
+
+class RateBudget:
+    """Token bucket shared by bulk jobs to stay under a global request rate.
+
+    discord.py already honours the per-route buckets Discord reports, but a
+    job that fans out over hundreds of routes can still trip the global
+    limit; every request in such a job takes a token from here first.
+    """
+
+    def __init__(self, rate, per=1.0, burst=None):
+        self.rate = rate / per
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _retryable(error):
+    return isinstance(error, discord.HTTPException) and (error.status == 429 or error.status >= 500)
+
+
+async def run_bounded(items, func, concurrency=5, budget=None, on_progress=None, retries=3):
+    """Await ``func(item)`` for every item with at most ``concurrency`` in flight.
+
+    Rate limited (429) and server side failures are retried with exponential
+    backoff. ``on_progress(done, total)`` is called after each item finishes.
+    Returns ``(succeeded, failed)`` where ``failed`` holds ``(item, error)``.
+    """
+    items = list(items)
+    semaphore = asyncio.Semaphore(concurrency)
+    succeeded = []
+    failed = []
+    done = 0
+
+    async def worker(item):
+        nonlocal done
+        async with semaphore:
+            for attempt in range(retries + 1):
+                if budget is not None:
+                    await budget.acquire()
+                try:
+                    await func(item)
+                except Exception as e:
+                    if _retryable(e) and attempt < retries:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+                    failed.append((item, e))
+                else:
+                    succeeded.append(item)
+                break
+
+        done += 1
+        if on_progress is not None:
+            on_progress(done, len(items))
+
+    await asyncio.gather(*(worker(item) for item in items))
+    return succeeded, failed
@@ -0,0 +1,95 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a single sleep so a wall clock adjustment is noticed eventually
+MAX_SLEEP = 300
+
+
+class DeadlineScheduler:
+    """Calls ``callback(key)`` once the deadline registered for ``key`` passes.
+
+    Deadlines are naive UTC datetimes, like everything else the bot stores.
+    They live in a min-heap, so the runner sleeps exactly until the earliest
+    one instead of polling. Rescheduling or cancelling only updates
+    ``_deadlines``; outdated heap entries are skipped when they reach the top.
+    """
+
+    def __init__(self, callback, name='scheduler'):
+        self.callback = callback
+        self.name = name
+        self._heap = []
+        self._deadlines = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = set()
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def schedule(self, key, when):
+        """Run the callback for ``key`` at ``when``, replacing any earlier deadline"""
+        self._deadlines[key] = when
+        heapq.heappush(self._heap, (when, key))
+        if self._heap[0][1] == key:
+            # New earliest deadline, the runner has to shorten its sleep
+            self._wakeup.set()
+
+        # Rebuild once outdated entries dominate the heap
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(when, key) for key, when in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key):
+        self._deadlines.pop(key, None)
+
+    def start(self, loop=None):
+        loop = loop or asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _fire(self, key):
+        try:
+            await self.callback(key)
+        except Exception as e:
+            logger.error(f"{self.name}: callback for {key} failed: {e}")
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == when:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+
+            for key in self._pop_due(datetime.utcnow()):
+                task = loop.create_task(self._fire(key))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            timeout = None
+            if self._heap:
+                timeout = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                timeout = min(max(timeout, 0), MAX_SLEEP)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
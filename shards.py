@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def shard_options():
+    """``shard_count``/``shard_ids`` for AutoShardedBot from the environment.
+
+    SHARD_COUNT is the total number of shards across all processes (unset
+    lets Discord recommend one); SHARD_IDS is the comma separated subset this
+    process runs, e.g. "0,1" and "2,3" for two processes of four shards.
+    """
+    options = {}
+    count = os.getenv("SHARD_COUNT")
+    ids = os.getenv("SHARD_IDS")
+    if count:
+        options["shard_count"] = int(count)
+    if ids:
+        if not count:
+            raise RuntimeError("SHARD_IDS needs SHARD_COUNT to be set as well")
+        options["shard_ids"] = [int(shard_id) for shard_id in ids.split(",") if shard_id.strip()]
+    return options
+
+
+class ShardHealth:
+    __slots__ = ("connects", "disconnects", "resumes", "last_sequence", "last_sample", "event_rate")
+
+    def __init__(self):
+        self.connects = 0
+        self.disconnects = 0
+        self.resumes = 0
+        self.last_sequence = None
+        self.last_sample = None
+        self.event_rate = 0.0
+
+
+class ShardMetrics:
+    """Connection counters and gateway event rate for every shard.
+
+    The event rate comes from the gateway sequence number, which Discord
+    increments once per dispatched event, sampled every ``interval`` seconds;
+    nothing runs per event.
+    """
+
+    def __init__(self, interval=30):
+        self.interval = interval
+        self.shards = {}
+        self._task = None
+
+    def get(self, shard_id):
+        health = self.shards.get(shard_id)
+        if health is None:
+            health = self.shards[shard_id] = ShardHealth()
+        return health
+
+    def connected(self, shard_id):
+        self.get(shard_id).connects += 1
+
+    def disconnected(self, shard_id):
+        self.get(shard_id).disconnects += 1
+
+    def resumed(self, shard_id):
+        self.get(shard_id).resumes += 1
+
+    @staticmethod
+    def _sequence(shard):
+        # ShardInfo doesn't expose its websocket; read the sequence defensively
+        ws = getattr(getattr(shard, "_parent", None), "ws", None)
+        return getattr(ws, "sequence", None)
+
+    def sample(self, bot):
+        now = time.monotonic()
+        for shard_id, shard in bot.shards.items():
+            health = self.get(shard_id)
+            sequence = self._sequence(shard)
+            if sequence is None:
+                continue
+            # A fresh session restarts the sequence, skip that interval
+            if health.last_sequence is not None and sequence >= health.last_sequence:
+                health.event_rate = (sequence - health.last_sequence) / (now - health.last_sample)
+            health.last_sequence = sequence
+            health.last_sample = now
+
+    async def _run(self, bot):
+        while not bot.is_closed():
+            try:
+                self.sample(bot)
+            except Exception as e:
+                logger.warning(f"Shard sampling failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, bot):
+        if self._task is None or self._task.done():
+            self._task = bot.loop.create_task(self._run(bot))
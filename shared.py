@@ -0,0 +1,55 @@
+"""Objects used by both bot.py and the cog extensions in cogs/.
+
+Extensions are imported as their own modules (and re-imported by /reload),
+so anything they share with bot.py lives here. This module is never
+reloaded, which keeps caches and the cluster connection alive across a
+cog reload.
+"""
+import re
+
+from cluster import Cluster
+from guildconfig import GuildConfig
+from membercache import MemberCachePolicy
+from modcases import CaseLog
+from modlog import ModLog
+from polls import PollTracker
+from shards import ShardMetrics
+from storage import db, writer
+
+# Default prefix, guilds can override it with /config
+PREFIX = '!'
+
+# Per-guild settings (role/channel IDs, prefix) cached in memory
+guild_config = GuildConfig(db)
+
+# Cross-process queries and scheduler leadership when started by cluster.py
+cluster = Cluster.from_env()
+
+# Which members stay cached: MEMBER_CACHE=all (default) or active
+member_cache = MemberCachePolicy.from_env()
+
+# Per-shard reconnect counters and event rate for /botinfo
+shard_metrics = ShardMetrics(interval=30)
+
+# Numbered record of every moderation action, written through the write-behind queue
+cases = CaseLog(db, writer)
+
+# Live poll tallies; kept here so a /reload of the utility cog doesn't drop votes
+polls = PollTracker(db, edit_delay=3.0, flush_interval=10.0)
+
+# Batched delivery of moderation embeds to each guild's mod-log channel
+mod_log = ModLog(guild_config, flush_interval=3.0)
+
+
+def parse_time(time_str):
+    """Parse time string like '1h30m' into seconds"""
+    time_regex = re.compile(r'(\d+)([dhms])')
+    matches = time_regex.findall(time_str.lower())
+
+    total_seconds = 0
+    time_units = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}
+
+    for amount, unit in matches:
+        total_seconds += int(amount) * time_units.get(unit, 0)
+
+    return total_seconds
@@ -0,0 +1,53 @@
+import logging
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """How long each phase of a cold start took, logged once the bot is ready.
+
+    Phases run back to back: each :meth:`mark` ends the phase that began at
+    the previous mark, or when the timer was created. Opening the database
+    happens on its own thread alongside the other phases, so it is reported
+    separately.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._last = self.started
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self, database=None):
+        phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases)
+        report = f"Startup took {self._last - self.started:.2f}s ({phases})"
+        if database is not None and database.open_seconds is not None:
+            report += f", database opened in {database.open_seconds:.2f}s alongside"
+        return report
+
+    def install(self, bot, database=None):
+        """Mark login, the first READY and the end of guild chunking on ``bot``"""
+        login = bot.login
+
+        @wraps(login)
+        async def timed_login(token):
+            await login(token)
+            self.mark("login")
+
+        bot.login = timed_login
+
+        # "connect" is dispatched when a shard's READY payload has been handled
+        @bot.listen("on_connect", once=True)
+        async def startup_ready():
+            self.mark("ready")
+
+        @bot.listen("on_ready", once=True)
+        async def startup_chunked():
+            self.mark("guild chunking")
+            logger.info(self.report(database))
@@ -0,0 +1,469 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'bot_data.db'
+
+# Forward-only schema migrations as (version, description, statements). Each
+# run of pending migrations happens in one transaction together with its
+# schema_version rows, so a failure leaves the database as it was. Never
+# change a migration that has shipped; append a new one instead. The early
+# ones use IF NOT EXISTS because databases created before versioning already
+# contain some of their tables.
+MIGRATIONS = [
+    (1, 'warnings, reaction roles and mutes', [
+        '''
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            guild_id INTEGER,
+            moderator_id INTEGER,
+            reason TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS reaction_roles (
+            message_id INTEGER,
+            emoji TEXT,
+            role_id INTEGER,
+            guild_id INTEGER,
+            PRIMARY KEY (message_id, emoji)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS muted_users (
+            user_id INTEGER,
+            guild_id INTEGER,
+            unmute_time DATETIME,
+            PRIMARY KEY (user_id, guild_id)
+        )
+        ''',
+    ]),
+    (2, 'giveaways', [
+        '''
+        CREATE TABLE IF NOT EXISTS giveaways (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            guild_id INTEGER,
+            host_id INTEGER,
+            prize TEXT,
+            end_time DATETIME,
+            ended INTEGER DEFAULT 0,
+            winner_id INTEGER
+        )
+        ''',
+    ]),
+    (3, 'lookup indexes', [
+        # Pending unmutes are loaded in expiry order at startup
+        'CREATE INDEX IF NOT EXISTS idx_muted_users_unmute_time ON muted_users (unmute_time)',
+        'CREATE INDEX IF NOT EXISTS idx_giveaways_running ON giveaways (ended, end_time)',
+        # Warnings are always looked up per member, newest first
+        'CREATE INDEX IF NOT EXISTS idx_warnings_guild_user ON warnings (guild_id, user_id, id)',
+    ]),
+    (4, 'word and link filter', [
+        '''
+        CREATE TABLE IF NOT EXISTS filter_terms (
+            guild_id INTEGER,
+            term TEXT,
+            kind TEXT,
+            PRIMARY KEY (guild_id, term, kind)
+        )
+        ''',
+    ]),
+    (5, 'warning counts', [
+        # Warning count per member, kept in step with the warnings table by triggers
+        '''
+        CREATE TABLE IF NOT EXISTS warning_counts (
+            guild_id INTEGER,
+            user_id INTEGER,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_warnings_insert AFTER INSERT ON warnings
+        BEGIN
+            INSERT INTO warning_counts (guild_id, user_id, count) VALUES (NEW.guild_id, NEW.user_id, 1)
+            ON CONFLICT (guild_id, user_id) DO UPDATE SET count = count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_warnings_delete AFTER DELETE ON warnings
+        BEGIN
+            UPDATE warning_counts SET count = count - 1
+            WHERE guild_id = OLD.guild_id AND user_id = OLD.user_id;
+            DELETE FROM warning_counts
+            WHERE guild_id = OLD.guild_id AND user_id = OLD.user_id AND count <= 0;
+        END
+        ''',
+        # Counts for warnings stored before the counter table existed
+        '''
+        INSERT OR IGNORE INTO warning_counts (guild_id, user_id, count)
+        SELECT guild_id, user_id, COUNT(*) FROM warnings GROUP BY guild_id, user_id
+        ''',
+    ]),
+    (6, 'guild settings', [
+        # Per-guild settings as key/value pairs
+        '''
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER,
+            key TEXT,
+            value TEXT,
+            PRIMARY KEY (guild_id, key)
+        )
+        ''',
+    ]),
+    (7, 'moderation cases', [
+        # Every moderation action, numbered per guild
+        '''
+        CREATE TABLE mod_cases (
+            id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            case_number INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            moderator_id INTEGER,
+            reason TEXT,
+            duration INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (guild_id, case_number)
+        )
+        ''',
+        'CREATE INDEX idx_mod_cases_user ON mod_cases (guild_id, user_id, case_number)',
+        # Full-text index over reasons, stored once in mod_cases (external content)
+        "CREATE VIRTUAL TABLE mod_cases_fts USING fts5(reason, content='mod_cases', content_rowid='id')",
+        '''
+        CREATE TRIGGER trg_mod_cases_insert AFTER INSERT ON mod_cases
+        BEGIN
+            INSERT INTO mod_cases_fts (rowid, reason) VALUES (NEW.id, NEW.reason);
+        END
+        ''',
+        '''
+        CREATE TRIGGER trg_mod_cases_delete AFTER DELETE ON mod_cases
+        BEGIN
+            INSERT INTO mod_cases_fts (mod_cases_fts, rowid, reason) VALUES ('delete', OLD.id, OLD.reason);
+        END
+        ''',
+        '''
+        CREATE TRIGGER trg_mod_cases_update AFTER UPDATE OF reason ON mod_cases
+        BEGIN
+            INSERT INTO mod_cases_fts (mod_cases_fts, rowid, reason) VALUES ('delete', OLD.id, OLD.reason);
+            INSERT INTO mod_cases_fts (rowid, reason) VALUES (NEW.id, NEW.reason);
+        END
+        ''',
+        # Existing warnings become the first cases of each guild
+        '''
+        INSERT INTO mod_cases (guild_id, case_number, action, user_id, moderator_id, reason, created_at)
+        SELECT guild_id, ROW_NUMBER() OVER (PARTITION BY guild_id ORDER BY id), 'warn',
+               user_id, moderator_id, reason, timestamp
+        FROM warnings
+        ''',
+    ]),
+    (8, 'polls', [
+        '''
+        CREATE TABLE polls (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL,
+            author_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            options TEXT NOT NULL,
+            end_time DATETIME,
+            closed INTEGER DEFAULT 0
+        )
+        ''',
+        'CREATE INDEX idx_polls_running ON polls (closed, end_time)',
+        # One row per voter, the tally itself only lives in memory
+        '''
+        CREATE TABLE poll_votes (
+            message_id INTEGER,
+            user_id INTEGER,
+            option INTEGER NOT NULL,
+            PRIMARY KEY (message_id, user_id)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class Database:
+    """Shared SQLite connection used by every cog.
+
+    sqlite3 calls block (and fsync on commit), so nothing here touches the
+    connection from the event loop. Every query is handed to a single worker
+    thread which owns the one persistent connection; running everything on
+    one thread also serializes writers without any extra locking.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._conn = None
+        # Seconds the first connection and schema setup took, for the startup report
+        self.open_seconds = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+
+    def _connect(self):
+        started = time.perf_counter()
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        # WAL lets readers run alongside the writer and makes commits much cheaper
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+
+        self._migrate(conn)
+
+        if self.open_seconds is None:
+            self.open_seconds = time.perf_counter() - started
+        logger.info(f"Opened database {self.path}")
+        return conn
+
+    @staticmethod
+    def _schema_version(conn):
+        try:
+            return conn.execute('SELECT MAX(version) FROM schema_version').fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            # No schema_version table yet
+            return 0
+
+    def _migrate(self, conn):
+        """Bring the schema up to SCHEMA_VERSION; a single query when it already is"""
+        version = self._schema_version(conn)
+        if version == SCHEMA_VERSION:
+            return
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} is at schema version {version}, newer than this code ({SCHEMA_VERSION})")
+
+        # IMMEDIATE takes the write lock up front; another cluster process may
+        # be migrating the same file, so read the version again once we hold it
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            start = version = self._schema_version(conn)
+            for number, description, statements in MIGRATIONS:
+                if number <= version:
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (number, description))
+                version = number
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        if version != start:
+            logger.info(f"Migrated {self.path} from schema version {start} to {version}")
+
+    def _connection(self):
+        # Only ever called on the worker thread
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    async def _submit(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # Statements are cached by the connection (cached_statements), so passing
+    # the same SQL text again reuses the already prepared statement.
+
+    def _execute(self, sql, params):
+        conn = self._connection()
+        with conn:
+            return conn.execute(sql, params).rowcount
+
+    def _executemany(self, sql, seq_of_params):
+        conn = self._connection()
+        with conn:
+            return conn.executemany(sql, seq_of_params).rowcount
+
+    def _fetchone(self, sql, params):
+        return self._connection().execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params):
+        return self._connection().execute(sql, params).fetchall()
+
+    def _transaction(self, func, args):
+        conn = self._connection()
+        with conn:
+            return func(conn, *args)
+
+    async def execute(self, sql, params=()):
+        """Run a single write statement and commit it, returning the row count"""
+        return await self._submit(self._execute, sql, params)
+
+    async def executemany(self, sql, seq_of_params):
+        """Run one statement for every parameter tuple inside a single transaction"""
+        return await self._submit(self._executemany, sql, list(seq_of_params))
+
+    async def fetchone(self, sql, params=()):
+        return await self._submit(self._fetchone, sql, params)
+
+    async def fetchall(self, sql, params=()):
+        return await self._submit(self._fetchall, sql, params)
+
+    async def transaction(self, func, *args):
+        """Call ``func(conn, *args)`` on the worker thread inside one transaction"""
+        return await self._submit(self._transaction, func, args)
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def close(self):
+        await self._submit(self._close)
+
+
+class WriteBehindQueue:
+    """Buffers warning, mute and case writes and commits them in batches.
+
+    During a raid moderators can issue dozens of warns/mutes a minute; doing an
+    INSERT + commit for each one means one fsync per action. Writes are kept in
+    memory and flushed as a single transaction once ``flush_interval`` seconds
+    have passed or ``max_pending`` writes are waiting, whichever comes first.
+
+    Pending warnings are still counted by :meth:`warning_count`, so callers
+    always see their own writes even before they hit disk.
+    """
+
+    def __init__(self, database, flush_interval=2.0, max_pending=50):
+        self.db = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._warnings = []
+        # (user_id, guild_id) -> unmute_time, or None for a pending delete.
+        # Only the latest write per member matters so mutes coalesce here.
+        self._mutes = {}
+        # (user_id, guild_id) -> warnings queued or in flight
+        self._pending_warnings = {}
+        self._cases = []
+        self._lock = asyncio.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._warnings) + len(self._mutes) + len(self._cases)
+
+    async def add_warning(self, user_id, guild_id, moderator_id, reason):
+        """Queue a warning; returns the member's warning count before and after it"""
+        previous = await self.warning_count(user_id, guild_id)
+        # Nothing is awaited between reading the count and queueing, so
+        # concurrent warnings for one member each get a count of their own
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        self._warnings.append((user_id, guild_id, moderator_id, reason, timestamp))
+        key = (user_id, guild_id)
+        self._pending_warnings[key] = self._pending_warnings.get(key, 0) + 1
+        self._schedule()
+        return previous, previous + 1
+
+    def add_case(self, guild_id, case_number, action, user_id, moderator_id, reason, duration, created_at):
+        self._cases.append((guild_id, case_number, action, user_id, moderator_id, reason, duration, created_at))
+        self._schedule()
+
+    def set_mute(self, user_id, guild_id, unmute_time):
+        self._mutes[(user_id, guild_id)] = unmute_time
+        self._schedule()
+
+    def clear_mute(self, user_id, guild_id):
+        self._mutes[(user_id, guild_id)] = None
+        self._schedule()
+
+    async def warning_count(self, user_id, guild_id):
+        """Number of warnings for a member, including ones not yet flushed"""
+        row = await self.db.fetchone('''
+            SELECT count FROM warning_counts WHERE guild_id = ? AND user_id = ?
+        ''', (guild_id, user_id))
+        # Read the pending count only after the query returns: a flush that
+        # committed before our query has already been subtracted by then.
+        return (row[0] if row else 0) + self._pending_warnings.get((user_id, guild_id), 0)
+
+    def _schedule(self):
+        loop = asyncio.get_running_loop()
+        if len(self) >= self.max_pending:
+            loop.create_task(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    @staticmethod
+    def _write_batch(conn, warnings, mutes, cases):
+        if warnings:
+            conn.executemany('''
+                INSERT INTO warnings (user_id, guild_id, moderator_id, reason, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', warnings)
+
+        upserts = [(user_id, guild_id, unmute_time)
+                   for (user_id, guild_id), unmute_time in mutes.items() if unmute_time is not None]
+        deletes = [key for key, unmute_time in mutes.items() if unmute_time is None]
+        if upserts:
+            conn.executemany('''
+                INSERT OR REPLACE INTO muted_users (user_id, guild_id, unmute_time)
+                VALUES (?, ?, ?)
+            ''', upserts)
+        if deletes:
+            conn.executemany('DELETE FROM muted_users WHERE user_id = ? AND guild_id = ?', deletes)
+
+        if cases:
+            conn.executemany('''
+                INSERT INTO mod_cases (guild_id, case_number, action, user_id, moderator_id, reason, duration, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', cases)
+
+    async def flush(self):
+        """Write everything queued so far in one transaction"""
+        async with self._lock:
+            if not len(self):
+                return
+
+            warnings, self._warnings = self._warnings, []
+            mutes, self._mutes = self._mutes, {}
+            cases, self._cases = self._cases, []
+
+            try:
+                await self.db.transaction(self._write_batch, warnings, mutes, cases)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(warnings) + len(mutes) + len(cases)} queued writes: {e}")
+                # Put the batch back in front of anything queued meanwhile
+                self._warnings = warnings + self._warnings
+                self._cases = cases + self._cases
+                mutes.update(self._mutes)
+                self._mutes = mutes
+                self._schedule()
+                return
+
+            for user_id, guild_id, *_ in warnings:
+                key = (user_id, guild_id)
+                self._pending_warnings[key] -= 1
+                if not self._pending_warnings[key]:
+                    del self._pending_warnings[key]
+
+    async def close(self):
+        """Cancel the flush timer and write out anything still pending"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+
+# Shared instances used by all cogs
+db = Database()
+writer = WriteBehindQueue(db)
@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from wordfilter import AhoCorasick, CompiledFilter, normalize
+
+
+def matches(automaton, text):
+    return sorted((start, end, automaton.terms[index]) for start, end, index in automaton.search(text))
+
+
+def naive_matches(terms, text):
+    return sorted(
+        (start, start + len(term), term)
+        for term in set(terms)
+        for start in range(len(text) - len(term) + 1)
+        if text.startswith(term, start)
+    )
+
+
+# AhoCorasick
+
+def test_overlapping_and_suffix_terms():
+    # The textbook case: "he" is a suffix of "she" and a prefix of "hers"
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert matches(automaton, "ushers") == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_term_that_is_a_suffix_of_another_is_found_through_fail_links():
+    automaton = AhoCorasick(["abcd", "bcd", "cd", "d"])
+    assert matches(automaton, "xabcdx") == [(1, 5, "abcd"), (2, 5, "bcd"), (3, 5, "cd"), (4, 5, "d")]
+
+
+def test_fail_link_after_partial_match():
+    # "aab" must be found after the walk for "aaa" breaks off
+    automaton = AhoCorasick(["aaa", "aab"])
+    assert matches(automaton, "aaab") == [(0, 3, "aaa"), (1, 4, "aab")]
+
+
+def test_repeated_overlapping_occurrences():
+    automaton = AhoCorasick(["aa"])
+    assert matches(automaton, "aaaa") == [(0, 2, "aa"), (1, 3, "aa"), (2, 4, "aa")]
+
+
+def test_no_terms_and_no_matches():
+    assert matches(AhoCorasick([]), "anything") == []
+    assert matches(AhoCorasick(["xyz"]), "abc") == []
+
+
+def test_agrees_with_naive_search_on_random_input():
+    rng = random.Random(0)
+    for _ in range(200):
+        terms = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 30)))
+        automaton = AhoCorasick(dict.fromkeys(terms))
+        assert matches(automaton, text) == naive_matches(terms, text), (terms, text)
+
+
+# normalize
+
+@pytest.mark.parametrize("text, expected", [
+    ("BAD", "bad"),
+    ("ｂａｄ", "bad"),  # fullwidth
+    ("𝐛𝐚𝐝", "bad"),  # mathematical bold
+    ("bád", "bad"),
+    ("b\u200ba\u200dd", "bad"),
+    ("b\u00ada\ufeffd", "bad"),
+    ("Ьаd", "ьad"),  # only letters on the confusables list are folded
+    ("ехаmрlе", "example"),  # Cyrillic е, х, а, р
+    ("b4d", "bad"),
+    ("$h1t", "shit"),
+])
+def test_normalize(text, expected):
+    assert normalize(text) == expected
+
+
+# CompiledFilter
+
+def test_word_only_matches_on_word_boundaries():
+    compiled = CompiledFilter([("ass", "word")])
+    assert compiled.check("what a class act") is None
+    assert compiled.check("assistant") is None
+    assert compiled.check("bass") is None
+    assert compiled.check("you ass") == "ass"
+    assert compiled.check("ass!") == "ass"
+    assert compiled.check("(ass)") == "ass"
+
+
+def test_word_inside_longer_term_still_finds_the_longer_term():
+    # "ass" is rejected inside "badass", which is a term of its own
+    compiled = CompiledFilter([("ass", "word"), ("badass", "word")])
+    assert compiled.check("such a badass") == "badass"
+
+
+def test_boundary_rejection_keeps_scanning():
+    compiled = CompiledFilter([("ass", "word")])
+    assert compiled.check("classy ass") == "ass"
+
+
+def test_links_match_anywhere():
+    compiled = CompiledFilter([("grabify.link", "link")])
+    assert compiled.check("see https://grabify.link/abc") == "grabify.link"
+    assert compiled.check("xgrabify.linkx") == "grabify.link"
+
+
+def test_obfuscated_text_is_caught():
+    compiled = CompiledFilter([("spam", "word")])
+    assert compiled.check("buy s\u200bp\u200ca\u200dm now") == "spam"
+    assert compiled.check("buy ѕраm now") == "spam"  # Cyrillic ѕ, р, а
+    assert compiled.check("buy SPAM now") == "spam"
+    assert compiled.check("buy $p4m now") == "spam"
+
+
+def test_zero_width_characters_do_not_create_a_word_boundary():
+    compiled = CompiledFilter([("ass", "word")])
+    assert compiled.check("cl\u200bass") is None
+
+
+def test_terms_are_normalized_too():
+    compiled = CompiledFilter([("ЅРАМ", "word"), ("", "word")])
+    assert len(compiled) == 1
+    assert compiled.check("spam") == "spam"
+
+
+def test_empty_filter():
+    assert CompiledFilter([]).check("anything") is None
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import time
+
+from automod import RateWindow
+
+logger = logging.getLogger(__name__)
+
+
+class WelcomeBatcher:
+    """Sends welcomes one by one when joins are slow, grouped during floods.
+
+    Each guild's join rate is tracked over ``window`` seconds. Up to
+    ``threshold`` joins per window, each member is welcomed right away through
+    ``send_one(member)``. Above that, joins are buffered and after ``delay``
+    seconds everyone waiting is welcomed together with
+    ``send_many(guild, members)``.
+    """
+
+    def __init__(self, send_one, send_many, threshold=5, window=10, delay=5.0, max_batch=500):
+        self.send_one = send_one
+        self.send_many = send_many
+        self.threshold = threshold
+        self.window = window
+        self.delay = delay
+        self.max_batch = max_batch
+        # guild_id -> RateWindow of joins
+        self._rates = {}
+        # guild_id -> members waiting for the grouped welcome
+        self._pending = {}
+        self._timers = {}
+
+    async def add(self, member):
+        guild_id = member.guild.id
+        rate = self._rates.get(guild_id)
+        if rate is None:
+            rate = self._rates[guild_id] = RateWindow(self.window)
+        joins = rate.add(time.monotonic())
+
+        if joins <= self.threshold and guild_id not in self._pending:
+            await self.send_one(member)
+            return
+
+        pending = self._pending.setdefault(guild_id, [])
+        if len(pending) < self.max_batch:
+            pending.append(member)
+        if guild_id not in self._timers:
+            self._timers[guild_id] = asyncio.get_running_loop().create_task(self._flush_later(member.guild))
+
+    async def _flush_later(self, guild):
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self._timers.pop(guild.id, None)
+        await self.flush(guild)
+
+    async def flush(self, guild):
+        members = self._pending.pop(guild.id, None)
+        if not members:
+            return
+        try:
+            if len(members) == 1:
+                await self.send_one(members[0])
+            else:
+                await self.send_many(guild, members)
+        except Exception as e:
+            logger.warning(f"Failed to welcome {len(members)} members in {guild}: {e}")
+
+    def forget(self, guild_id):
+        self._rates.pop(guild_id, None)
+        self._pending.pop(guild_id, None)
+        timer = self._timers.pop(guild_id, None)
+        if timer is not None:
+            timer.cancel()
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import unicodedata
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Look-alike characters folded to the ASCII letter they imitate
+CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ї": "i", "ј": "j",
+    "ѕ": "s", "ԁ": "d", "ɡ": "g",
+    # Greek
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ω": "w",
+}
+
+# Only symbols that rarely end a sentence, so "!" or "|" still act as word boundaries
+LEETSPEAK = {
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s",
+}
+
+# Zero-width and joiner characters used to split words invisibly
+INVISIBLE = {"\u200b", "\u200c", "\u200d", "\u2060", "\ufeff", "\u00ad"}
+
+_FOLD = str.maketrans({**CONFUSABLES, **LEETSPEAK, **{char: None for char in INVISIBLE}})
+
+
+def normalize(text):
+    """Fold text so obfuscated spellings match the plain term.
+
+    Applies NFKC (fullwidth and styled letters), casefolding, strips
+    combining accents and maps confusables and leetspeak to ASCII letters.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return text.translate(_FOLD)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every term in one pass over the text.
+
+    The trie is stored as parallel lists indexed by node number. Each node's
+    ``fail`` link points at the longest proper suffix that is also a trie
+    path, and ``outputs`` already includes the outputs reachable through
+    fail links, so scanning never backtracks.
+    """
+
+    def __init__(self, terms):
+        self.terms = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+        for term in terms:
+            self._add(term)
+        self._build()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _add(self, term):
+        node = 0
+        for char in term:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = next_node
+        self.outputs[node].append(len(self.terms))
+        self.terms.append(term)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def search(self, text):
+        """Yield ``(start, end, term_index)`` for every match in ``text``"""
+        node = 0
+        goto, fail, outputs, terms = self.goto, self.fail, self.outputs, self.terms
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in outputs[node]:
+                yield position - len(terms[index]) + 1, position + 1, index
+
+
+class CompiledFilter:
+    """A guild's banned words and links compiled into one automaton"""
+
+    def __init__(self, terms):
+        # terms: iterable of (term, kind) with kind "word" or "link"
+        self.kinds = []
+        normalized = []
+        for term, kind in terms:
+            term = normalize(term)
+            if term:
+                normalized.append(term)
+                self.kinds.append(kind)
+        self.automaton = AhoCorasick(normalized)
+
+    def __len__(self):
+        return len(self.automaton)
+
+    def check(self, text):
+        """Return the first banned term found in ``text``, or None"""
+        if not len(self.automaton):
+            return None
+
+        text = normalize(text)
+        for start, end, index in self.automaton.search(text):
+            if self.kinds[index] == "word":
+                # Words only count on word boundaries so "class" doesn't hit "ass"
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+            return self.automaton.terms[index]
+        return None
+
+
+class FilterCache:
+    """Compiled filters per guild, built on first use and dropped on change.
+
+    Guilds without any terms are cached too, so messages there never touch
+    the database.
+    """
+
+    def __init__(self, database):
+        self.db = database
+        self._filters = {}
+        self._loading = {}
+        # Bumped on every change so a load that raced an edit isn't cached
+        self._versions = {}
+
+    def invalidate(self, guild_id):
+        self._filters.pop(guild_id, None)
+        self._loading.pop(guild_id, None)
+        self._versions[guild_id] = self._versions.get(guild_id, 0) + 1
+
+    async def _load(self, guild_id):
+        rows = await self.db.fetchall('SELECT term, kind FROM filter_terms WHERE guild_id = ?', (guild_id,))
+        compiled = CompiledFilter(rows)
+        logger.info(f"Compiled {len(compiled)} filter terms for guild {guild_id}")
+        return compiled
+
+    async def get(self, guild_id):
+        compiled = self._filters.get(guild_id)
+        if compiled is not None:
+            return compiled
+
+        version = self._versions.get(guild_id, 0)
+        # Share one load between concurrent messages from the same guild
+        task = self._loading.get(guild_id)
+        if task is None:
+            task = self._loading[guild_id] = asyncio.ensure_future(self._load(guild_id))
+        try:
+            compiled = await task
+        finally:
+            if self._loading.get(guild_id) is task:
+                del self._loading[guild_id]
+
+        if self._versions.get(guild_id, 0) == version:
+            self._filters[guild_id] = compiled
+        return compiled